@@ -1,4 +1,4 @@
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
@@ -19,12 +19,16 @@ def create_app(config_class=Config):
     app.config.from_object(config_class)
     app.url_map.strict_slashes = False
 
+    from utils.json_provider import AppJSONProvider
+    app.json = AppJSONProvider(app)
+
     CORS(app,
     resources={
         r"/api/*": {
             "origins": "http://localhost:5173",
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
+            "allow_headers": ["Content-Type", "Authorization"],
+            "expose_headers": ["X-Next-Cursor", "X-Query-Count", "Server-Timing"]
         }
     },
     supports_credentials=True
@@ -32,12 +36,30 @@ def create_app(config_class=Config):
 
     
     db.init_app(app)
-    migrate.init_app(app, db)
     jwt.init_app(app)
     bcrypt.init_app(app)
 
+    from utils import sql_instrumentation
+    with app.app_context():
+        sql_instrumentation.init_app(app, db.engine)
+
     # Import models
-    from models import user, workout, post, challenge, nutrition, product
+    from models import user, workout, post, challenge, nutrition, product, feed, exercise, workout_session, resource_version
+
+    from services import invalidation
+    invalidation.init_app(app)
+
+    from services.friend_index import friend_index
+    friend_index.init_app(app)
+
+    from services import cache
+    cache.init_app(app)
+
+    # Registers the full-text index DDL on the posts table
+    from services import post_search
+
+    # Autogenerate must leave the search index objects alone
+    migrate.init_app(app, db, include_object=post_search.include_object)
     
     # Registering blueprints
     from controllers import (
@@ -49,7 +71,8 @@ def create_app(config_class=Config):
         nutrition_controller,
         product_controller,
         profile_controller,
-        user_controller
+        user_controller,
+        cache_controller
     )
     
     app.register_blueprint(auth_controller.auth_bp, url_prefix='/api/auth')
@@ -61,12 +84,19 @@ def create_app(config_class=Config):
     app.register_blueprint(friend_controller.friend_bp, url_prefix='/api/friends')
     app.register_blueprint(nutrition_controller.nutrition_bp, url_prefix='/api/nutrition')
     app.register_blueprint(product_controller.product_bp, url_prefix='/api/products')
+    app.register_blueprint(cache_controller.cache_bp, url_prefix='/api/cache')
+
+
 
+    from commands import register_commands
+    register_commands(app)
 
+    from utils import compression
+    compression.init_app(app)
 
     @app.errorhandler(404)
     def not_found(e):
-        return send_from_directory(app.static_folder, "index.html")
+        return compression.send_static(app, "index.html")
     
     return app
 
@@ -0,0 +1,101 @@
+"""Micro-benchmark for the JSON response provider.
+
+Usage (from server/):
+
+    python -m benchmarks.json_encoding [--rows 200] [--repeat 200] [--debug]
+
+Encodes listing-shaped payloads (posts with author cards, workouts, users)
+with Flask's stdlib provider, fed pre-formatted `.isoformat()` strings the
+way the serializers used to, and with AppJSONProvider fed raw datetimes.
+Fails if the two responses differ by a single byte.
+"""
+import argparse
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from utils.json_provider import AppJSONProvider, orjson
+
+
+# Avatars are emoji in this app (User.avatar defaults to one), so most
+# listings carry non-ASCII text that has to be escaped
+AVATARS = ['👤', '🏋️', '💪', '🧘', '🏃‍♀️', 'https://i.pravatar.cc/150?img=12']
+
+
+def _payloads(rows, iso):
+    base = datetime(2024, 1, 1, 6, 30)
+
+    def ts(i):
+        value = base + timedelta(minutes=17 * i, microseconds=i % 7)
+        return value.isoformat() if iso else value
+
+    users = [{
+        'id': i,
+        'username': f'user{i:07d}',
+        'avatar': AVATARS[i % len(AVATARS)],
+        'bio': 'Chasing PRs and early mornings',
+        'created_at': ts(i),
+        'last_active': ts(i + 3),
+        'workout_count': i % 40,
+        'post_count': i % 25
+    } for i in range(rows)]
+    posts = [{
+        'id': i,
+        'content': 'Finished a 5k and a full body session, feeling great! ' * 2,
+        'image_url': None,
+        'likes': i % 90,
+        'created_at': ts(i),
+        'user': {'id': i % 50, 'username': f'user{i % 50:07d}', 'avatar': AVATARS[i % 5]}
+    } for i in range(rows)]
+    workouts = [{
+        'id': i,
+        'name': f'Workout {i}',
+        'description': 'Squats, push-ups, burpees and a plank finisher',
+        'duration': 20 + i % 40,
+        'difficulty': ('beginner', 'intermediate', 'advanced')[i % 3],
+        'category': 'strength',
+        'exercises': ['squats', 'push-ups', 'burpees'],
+        'video_url': None,
+        'user_id': i % 50,
+        'created_at': ts(i)
+    } for i in range(rows)]
+    return {'users': users, 'posts': posts, 'workouts': workouts}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--debug', action='store_true', help='use the indented debug-mode output')
+    args = parser.parse_args(argv)
+
+    app = Flask(__name__)
+    app.debug = args.debug
+    stdlib = DefaultJSONProvider(app)
+    fast = AppJSONProvider(app)
+    print(f"orjson: {'available' if orjson is not None else 'not installed (stdlib fallback)'}")
+
+    iso_payloads = _payloads(args.rows, iso=True)
+    raw_payloads = _payloads(args.rows, iso=False)
+    failed = False
+    with app.app_context():
+        for name in iso_payloads:
+            before = stdlib.response(iso_payloads[name]).get_data()
+            after = fast.response(raw_payloads[name]).get_data()
+            if before != after:
+                print(f"{name}: output differs from the stdlib provider")
+                failed = True
+                continue
+
+            old = timeit.timeit(lambda: stdlib.response(iso_payloads[name]), number=args.repeat)
+            new = timeit.timeit(lambda: fast.response(raw_payloads[name]), number=args.repeat)
+            print(f"  {name:10} {len(before):>9} bytes  stdlib {old / args.repeat * 1e3:7.3f}ms  "
+                  f"provider {new / args.repeat * 1e3:7.3f}ms  {old / new:5.1f}x")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,335 @@
+"""Endpoint benchmarks against a seeded local database.
+
+Usage (from server/):
+
+    python -m benchmarks.run                       # seed SQLite, run, compare
+    python -m benchmarks.run --database postgresql://localhost/gym_bench
+    python -m benchmarks.run --no-seed --http --concurrency 16
+    python -m benchmarks.run --update-baseline
+    python -m benchmarks.run --update-latency-baseline   # record this machine
+    python -m benchmarks.run --latency                   # also gate on p95
+
+Every hot endpoint is driven through the Flask test client (latency
+percentiles, throughput and SQL statements per request) and optionally
+through a real threaded HTTP server with a multi-threaded load generator.
+
+Queries per request are counted on a cold request, with every read-path
+cache and the friend index emptied first, so an N+1 behind a cache still
+shows up; the warm count is reported alongside.
+
+The exit status is 1 if any endpoint issues more queries per cold request
+than benchmarks/baseline.json records. Query counts don't depend on the
+machine, so that file is committed. Latencies do, so p95 is only gated
+with --latency, against a baseline recorded on the same machine
+(benchmarks/latency-baseline.local.json, not committed).
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from statistics import quantiles
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+LATENCY_BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'latency-baseline.local.json')
+
+# (name, path, authenticated)
+ENDPOINTS = [
+    ('auth.login', None, False),
+    ('posts.feed', '/api/posts/', False),
+    ('posts.feed_cursor', '/api/posts/?cursor=', False),
+    ('posts.search', '/api/posts/?search=fitness', False),
+    ('posts.timeline', '/api/posts/timeline', True),
+    ('posts.detail', '/api/posts/1', False),
+    ('workouts.list', '/api/workouts/', False),
+    ('workouts.by_exercise', '/api/workouts/?exercise=squats,burpees&match=all', False),
+    ('workouts.stats', '/api/workouts/stats', True),
+    ('workouts.analytics', '/api/workouts/analytics', True),
+    ('users.detail', '/api/users/1', False),
+    ('users.suggestions', '/api/users/suggestions', True),
+    ('friends.list', '/api/friends/', True),
+    ('friends.requests', '/api/friends/requests', True),
+    ('profile.get', '/api/profile', True),
+    ('challenges.list', '/api/challenges/', False),
+    ('challenges.leaderboard', '/api/challenges/1/leaderboard', True),
+    ('nutrition.list', '/api/nutrition/', False),
+    ('products.list', '/api/products/', False),
+]
+
+
+class QueryCounter:
+    """Counts SQL statements per thread via engine events"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self._local = threading.local()
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self._local.count = getattr(self._local, 'count', 0) + 1
+
+    def reset(self):
+        self._local.count = 0
+
+    @property
+    def count(self):
+        return getattr(self._local, 'count', 0)
+
+
+def _percentiles(samples):
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return value, value, value
+    cuts = quantiles(samples, n=100, method='inclusive')
+    return cuts[49], cuts[94], cuts[98]
+
+
+def _summarize(latencies, elapsed, queries=None, cold_queries=None):
+    p50, p95, p99 = _percentiles(latencies)
+    result = {
+        'requests': len(latencies),
+        'p50_ms': round(p50 * 1000, 3),
+        'p95_ms': round(p95 * 1000, 3),
+        'p99_ms': round(p99 * 1000, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0
+    }
+    if queries is not None:
+        result['queries_per_request'] = cold_queries
+        result['warm_queries_per_request'] = max(queries) if queries else 0
+    return result
+
+
+def build_app(database, seed, scale, seed_value):
+    os.environ['DATABASE_URL'] = database
+    os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-secret-key-benchmark-secret')
+
+    import seed as seed_module
+
+    if seed:
+        seed_module.seed_bulk(
+            num_users=scale,
+            num_posts=scale * 5,
+            num_sessions=scale * 5,
+            seed=seed_value
+        )
+    return seed_module.app
+
+
+def _auth_headers(app, user_id):
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        token = create_access_token(identity=user_id, expires_delta=False)
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _login_body():
+    from seed import BULK_PASSWORD
+
+    return {'username': 'user0000002', 'password': BULK_PASSWORD}
+
+
+def _clear_caches(app):
+    """Empty every read-path cache and the friend index so the next request runs cold"""
+    from services.friend_index import friend_index
+
+    with app.app_context():
+        for cache in app.extensions.get('caches', {}).values():
+            cache.clear()
+        friend_index.invalidate()
+
+
+def run_test_client(app, counter, iterations, warmup, user_id):
+    client = app.test_client()
+    headers = _auth_headers(app, user_id)
+    results = {}
+
+    for name, path, authenticated in ENDPOINTS:
+        if name == 'auth.login':
+            request = lambda: client.post('/api/auth/login', json=_login_body())
+        else:
+            kwargs = {'headers': headers} if authenticated else {}
+            request = lambda: client.get(path, **kwargs)
+
+        _clear_caches(app)
+        counter.reset()
+        request()
+        cold_queries = counter.count
+
+        for _ in range(warmup):
+            request()
+
+        latencies, queries = [], []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            counter.reset()
+            t0 = time.perf_counter()
+            response = request()
+            latencies.append(time.perf_counter() - t0)
+            queries.append(counter.count)
+            if response.status_code >= 400:
+                raise RuntimeError(f'{name}: HTTP {response.status_code} {response.get_data(as_text=True)[:200]}')
+        results[name] = _summarize(latencies, time.perf_counter() - started, queries, cold_queries)
+        print(f"  {name:28} p50={results[name]['p50_ms']:8.2f}ms p95={results[name]['p95_ms']:8.2f}ms "
+              f"queries={results[name]['queries_per_request']} (warm {results[name]['warm_queries_per_request']})")
+    return results
+
+
+def run_http(app, requests_per_endpoint, concurrency, user_id):
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+    headers = _auth_headers(app, user_id)
+    results = {}
+
+    try:
+        for name, path, authenticated in ENDPOINTS:
+            if path is None:
+                continue
+
+            def fetch(_):
+                request = urllib.request.Request(base_url + path, headers=headers if authenticated else {})
+                t0 = time.perf_counter()
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+                return time.perf_counter() - t0
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                latencies = list(pool.map(fetch, range(requests_per_endpoint)))
+            results[name] = _summarize(latencies, time.perf_counter() - started)
+            print(f"  {name:28} p95={results[name]['p95_ms']:8.2f}ms "
+                  f"throughput={results[name]['throughput_rps']:8.1f} req/s")
+    finally:
+        server.shutdown()
+    return results
+
+
+def query_baseline(results):
+    """{endpoint: queries per cold request} from a test client run"""
+    return {name: result['queries_per_request'] for name, result in results['test_client'].items()}
+
+
+def compare_queries(results, baseline):
+    """Return human-readable regressions in statements per cold request"""
+    failures = []
+    for name, current in query_baseline(results).items():
+        previous = baseline.get(name)
+        if previous is not None and current > previous:
+            failures.append(f"{name}: {current} queries per cold request (baseline {previous})")
+    return failures
+
+
+def compare_latency(results, baseline, tolerance, min_delta_ms=0.0):
+    """Return human-readable p95 regressions against a same-machine baseline"""
+    failures = []
+    for mode, endpoints in results.items():
+        for name, current in endpoints.items():
+            previous = baseline.get(mode, {}).get(name)
+            if not previous:
+                continue
+            # Tiny endpoints jitter by whole percents; require an absolute slowdown too
+            limit = max(previous['p95_ms'] * (1 + tolerance), previous['p95_ms'] + min_delta_ms)
+            if current['p95_ms'] > limit:
+                failures.append(f"{mode}/{name}: p95 {current['p95_ms']}ms exceeds {limit:.2f}ms "
+                                f"(baseline {previous['p95_ms']}ms)")
+    return failures
+
+
+def _write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def _read_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', default='sqlite:////tmp/gymhum_bench.db')
+    parser.add_argument('--no-seed', action='store_true', help='reuse an already seeded database')
+    parser.add_argument('--scale', type=int, default=2000, help='number of users to seed')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--user-id', type=int, default=2, help='user to authenticate as')
+    parser.add_argument('--http', action='store_true', help='also run the threaded HTTP load test')
+    parser.add_argument('--http-requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='committed queries-per-request baseline')
+    parser.add_argument('--latency', action='store_true',
+                        help='also fail on p95 growth over the latency baseline')
+    parser.add_argument('--latency-baseline', default=LATENCY_BASELINE_PATH,
+                        help='p95 baseline recorded on this machine')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='allowed p95 growth over the baseline (0.5 = +50%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0,
+                        help='ignore p95 growth smaller than this many milliseconds')
+    parser.add_argument('--update-baseline', action='store_true', help='record queries per request')
+    parser.add_argument('--update-latency-baseline', action='store_true', help='record latencies for this machine')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    app = build_app(args.database, not args.no_seed, args.scale, args.seed)
+
+    from app import db
+
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+
+    print("Test client benchmarks:")
+    results = {'test_client': run_test_client(app, counter, args.iterations, args.warmup, args.user_id)}
+    if args.http:
+        print(f"HTTP load test ({args.concurrency} threads):")
+        results['http'] = run_http(app, args.http_requests, args.concurrency, args.user_id)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.update_baseline or args.update_latency_baseline:
+        if args.update_baseline:
+            _write_json(args.baseline, query_baseline(results))
+            print(f"Query baseline written to {args.baseline}")
+        if args.update_latency_baseline:
+            _write_json(args.latency_baseline, results)
+            print(f"Latency baseline written to {args.latency_baseline}")
+        return 0
+
+    failures = []
+    baseline = _read_json(args.baseline)
+    if baseline is None:
+        print("No query baseline found; run with --update-baseline to create one")
+    else:
+        failures += compare_queries(results, baseline)
+
+    if args.latency:
+        latency_baseline = _read_json(args.latency_baseline)
+        if latency_baseline is None:
+            print("No latency baseline for this machine; run with --update-latency-baseline first")
+        else:
+            failures += compare_latency(results, latency_baseline, args.tolerance, args.min_delta_ms)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    print("Benchmarks passed" if not failures else f"{len(failures)} regression(s)")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
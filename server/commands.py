@@ -0,0 +1,48 @@
+import click
+
+
+def register_commands(app):
+    @app.cli.command('reconcile-counters')
+    def reconcile_counters():
+        """Backfill/repair the denormalized counters on users."""
+        from models.user import User
+
+        updated = User.reconcile_counters()
+        click.echo(f"Reconciled counters for {updated} users")
+
+    @app.cli.command('backfill-exercises')
+    def backfill_exercises():
+        """Parse Workout.exercises text into the exercise catalog."""
+        from services.exercise_catalog import backfill
+
+        processed = backfill()
+        click.echo(f"Linked exercises for {processed} workouts")
+
+    @app.cli.command('rebuild-workout-rollups')
+    def rebuild_workout_rollups():
+        """Recompute daily workout rollups from logged sessions."""
+        from services.workout_stats import rebuild_rollups
+
+        days = rebuild_rollups()
+        click.echo(f"Rebuilt {days} daily rollups")
+
+    @app.cli.command('create-search-index')
+    def create_search_index():
+        """Create (or rebuild) the post full-text index on an existing database."""
+        from app import db
+        from services.post_search import create_search_index
+
+        with db.engine.begin() as connection:
+            if create_search_index(connection, rebuild=True):
+                click.echo("Search index ready")
+            else:
+                click.echo("Full-text search not supported on this database; using LIKE")
+
+    @app.cli.command('compress-static')
+    @click.option('--min-size', default=512, show_default=True, help='Skip files smaller than this many bytes.')
+    def compress_static(min_size):
+        """Write .gz (and .br if brotli is installed) next to each text asset of the client build."""
+        from utils.compression import precompress_static
+
+        written = precompress_static(app.static_folder, min_size)
+        click.echo(f"Wrote {written} precompressed files")
@@ -4,6 +4,17 @@ from datetime import timedelta
 
 load_dotenv()
 
+
+def _parse_ttls(value):
+    """Parse "products=300,nutrition=120" into {'products': 300, 'nutrition': 120}"""
+    ttls = {}
+    for item in (value or '').split(','):
+        name, _, seconds = item.partition('=')
+        if name.strip() and seconds.strip():
+            ttls[name.strip()] = int(seconds)
+    return ttls
+
+
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
@@ -15,6 +26,53 @@ class Config:
     API_KEY = os.getenv("CLOUDINARY_API_KEY")
     API_SECRET = os.getenv("CLOUDINARY_API_SECRET")
 
+    # Seconds to keep per-user profile snapshots (0 disables the cache)
+    PROFILE_CACHE_TTL = int(os.getenv('PROFILE_CACHE_TTL', 0))
+
+    # Seconds before a worker reloads a user's cached friend ids (0 keeps them until invalidated)
+    FRIEND_INDEX_TTL = int(os.getenv('FRIEND_INDEX_TTL', 60))
+    # Users whose friend ids a worker keeps at most (least recently used are evicted)
+    FRIEND_INDEX_MAX_USERS = int(os.getenv('FRIEND_INDEX_MAX_USERS', 100000))
+
+    # Authors with more friends than this get fan-out-on-read timelines
+    FEED_FANOUT_MAX_FRIENDS = int(os.getenv('FEED_FANOUT_MAX_FRIENDS', 1000))
+
+    # Recent posts copied into each feed when a friendship is accepted
+    FEED_BACKFILL_POSTS = int(os.getenv('FEED_BACKFILL_POSTS', 20))
+
+    # Read-path caches: "memory" (per process) or "shared" (one SQLite file for
+    # every worker on the host, in a private 0700 directory under /dev/shm
+    # unless CACHE_SHARED_PATH is set; the file must be owned by the app user)
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+    CACHE_SHARED_PATH = os.getenv('CACHE_SHARED_PATH')
+    CACHE_DEFAULT_TTL = int(os.getenv('CACHE_DEFAULT_TTL', 60))
+    CACHE_MAXSIZE = int(os.getenv('CACHE_MAXSIZE', 1024))
+
+    # Per-namespace TTL overrides in seconds, e.g. CACHE_TTLS="products=300,author_cards=600"
+    CACHE_TTLS = {
+        'challenges': 30,
+        'author_cards': 300,
+        **_parse_ttls(os.getenv('CACHE_TTLS'))
+    }
+
+    # How cache/friend-index invalidations reach the other workers: "none",
+    # "memory" (same process, for tests), "log" (append-only file shared by the
+    # workers on one host, in the private runtime directory the shared cache
+    # uses unless INVALIDATION_LOG_PATH is set) or "postgres" (LISTEN/NOTIFY on
+    # the app database, for several hosts). Defaults to "log" where /dev/shm exists
+    INVALIDATION_TRANSPORT = os.getenv('INVALIDATION_TRANSPORT', 'log' if os.path.isdir('/dev/shm') else 'none')
+    INVALIDATION_LOG_PATH = os.getenv('INVALIDATION_LOG_PATH')
+
+    # Per-request SQL statistics (X-Query-Count / Server-Timing headers and a log line)
+    SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', 'false').lower() in ('1', 'true', 'yes')
+
+    # Warn when one statement shape runs more than this many times in a request
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', 5))
+
+    # Compress dynamic text/JSON responses of at least this many bytes
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+
     # CORS settings
     CORS_ORIGINS = ['http://localhost:5173']
     SERVER_PORT = 8000
@@ -0,0 +1,16 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models.user import User
+from services.cache import cache_stats
+
+cache_bp = Blueprint('cache', __name__)
+
+# Hit/miss stats per cache namespace for the worker serving the request (admin only)
+@cache_bp.route('/stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    user = User.query.get(get_jwt_identity())
+    if not user or not user.is_admin:
+        return jsonify({'message': 'Admin access required'}), 403
+
+    return jsonify(cache_stats()), 200
@@ -2,21 +2,47 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.challenge import Challenge, UserChallenge
 from models.user import User
+from models.resource_version import ResourceVersion
 from app import db
+from services.profile_loader import invalidate_profile
+from services.cache import memoize, invalidate
+from services.leaderboard import build_leaderboard
+from services.challenge_progress import apply_progress_batch, MAX_BATCH_SIZE
+from services import training_load
+from utils.conditional import conditional, current_validator
 
 challenge_bp = Blueprint('challenges', __name__)
 
-# Get all available challenges
-@challenge_bp.route('/', methods=['GET'])
-def get_challenges():
-    challenges = Challenge.query.filter_by(is_active=True).all()
-    return jsonify([{
+# Keyed by the collection validator so a worker never serves a list older than its ETag
+@memoize('challenges', tags=('challenges',))
+def _active_challenges(validator):
+    # Participant counts for every challenge in one GROUP BY
+    rows = db.session.query(
+        Challenge,
+        db.func.count(UserChallenge.id)
+    ).outerjoin(
+        UserChallenge, UserChallenge.challenge_id == Challenge.id
+    ).filter(
+        Challenge.is_active.is_(True)
+    ).group_by(
+        Challenge.id
+    ).order_by(
+        Challenge.id
+    ).all()
+
+    return [{
         'id': c.id,
         'name': c.name,
         'description': c.description,
         'target': c.target,
-        'participants_count': UserChallenge.query.filter_by(challenge_id=c.id).count()
-    } for c in challenges]), 200
+        'participants_count': participants
+    } for c, participants in rows]
+
+# Get all available challenges
+@challenge_bp.route('/', methods=['GET'])
+@conditional('challenges', Challenge)
+def get_challenges():
+    return jsonify(_active_challenges(current_validator())), 200
 
 # Join a challenge
 @challenge_bp.route('/<int:challenge_id>/join', methods=['POST'])
@@ -44,7 +70,10 @@ def join_challenge(challenge_id):
             progress=0
         )
         db.session.add(user_challenge)
+        ResourceVersion.bump('challenges')
         db.session.commit()
+        invalidate_profile(current_user_id)
+        invalidate('challenges')
         return jsonify({
             'message': 'Challenge joined successfully',
             'challenge': {
@@ -79,9 +108,43 @@ def get_user_challenges():
         'progress': uc.UserChallenge.progress,
         'target': uc.Challenge.target,
         'completed': uc.UserChallenge.progress >= uc.Challenge.target,
-        'joined_at': uc.UserChallenge.joined_at.isoformat()
+        'joined_at': uc.UserChallenge.joined_at
     } for uc in user_challenges]), 200
 
+# Get a challenge leaderboard with the caller's rank and neighbours
+@challenge_bp.route('/<int:challenge_id>/leaderboard', methods=['GET'])
+@jwt_required()
+def get_leaderboard(challenge_id):
+    current_user_id = get_jwt_identity()
+    
+    challenge = Challenge.query.get(challenge_id)
+    if not challenge:
+        return jsonify({'message': 'Challenge not found'}), 404
+    
+    limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+    around = max(0, min(request.args.get('around', 2, type=int), 25))
+    
+    return jsonify(build_leaderboard(
+        challenge,
+        user_id=current_user_id,
+        limit=limit,
+        around=around
+    )), 200
+
+# Training-load summary for every participant of a challenge
+@challenge_bp.route('/<int:challenge_id>/analytics', methods=['GET'])
+@jwt_required()
+def get_cohort_training_load(challenge_id):
+    challenge = Challenge.query.get(challenge_id)
+    if not challenge:
+        return jsonify({'message': 'Challenge not found'}), 404
+    
+    try:
+        start, end = training_load.range_from_args(request.args)
+        return jsonify(training_load.cohort_training_load(challenge.id, start, end)), 200
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
 # Update challenge progress
 @challenge_bp.route('/<int:challenge_id>/progress', methods=['PUT'])
 @jwt_required()
@@ -112,4 +175,28 @@ def update_progress(challenge_id):
         }), 200
     except Exception as e:
         db.session.rollback()
-        return jsonify({'message': str(e)}), 400
\ No newline at end of file
+        return jsonify({'message': str(e)}), 400
+
+# Update progress for many challenges at once (e.g. a wearable day sync)
+@challenge_bp.route('/progress', methods=['POST'])
+@jwt_required()
+def batch_update_progress():
+    current_user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data or not isinstance(data.get('updates'), list) or not data['updates']:
+        return jsonify({'message': 'A non-empty updates list is required'}), 400
+    
+    if len(data['updates']) > MAX_BATCH_SIZE:
+        return jsonify({'message': f'At most {MAX_BATCH_SIZE} updates per request'}), 400
+    
+    try:
+        results = apply_progress_batch(current_user_id, data['updates'])
+        db.session.commit()
+        return jsonify({
+            'message': 'Progress updated',
+            'results': results
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
@@ -2,6 +2,10 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.user import User, user_friends
 from app import db
+from services.friend_index import friend_index
+from services.profile_loader import invalidate_profile
+from services import timeline
+from services.user_serializer import serialize_users
 
 friend_bp = Blueprint('friends', __name__)
 
@@ -11,7 +15,7 @@ def get_friends():
     current_user_id = get_jwt_identity()
     user = User.query.get(current_user_id)
     friends = user.get_friends()
-    return jsonify({"friends": [friend.to_dict() for friend in friends]}), 200
+    return jsonify({"friends": serialize_users(friends)}), 200
 
 
 @friend_bp.route('/requests', methods=['GET'])
@@ -20,7 +24,7 @@ def get_friend_requests():
     current_user_id = get_jwt_identity()
     user = User.query.get(current_user_id)
     requests = user.get_pending_requests()
-    return jsonify([req.to_dict() for req in requests]), 200
+    return jsonify(serialize_users(requests)), 200
 
 @friend_bp.route('/<int:friend_id>', methods=['POST', 'DELETE'])
 @jwt_required()
@@ -53,7 +57,10 @@ def manage_friend(friend_id):
                      (user_friends.c.friend_id == current_user_id))
                 )
             )
+            timeline.remove_friendship(current_user_id, friend_id)
             db.session.commit()
+            friend_index.friendship_removed(current_user_id, friend_id)
+            invalidate_profile(current_user_id, friend_id)
             return jsonify({'message': 'Friendship removed'}), 200
         except Exception as e:
             db.session.rollback()
@@ -72,6 +79,7 @@ def respond_to_request(friend_id):
         if action == 'accept':
             user = User.query.get(current_user_id)
             user.accept_friend_request(User.query.get(friend_id))
+            invalidate_profile(current_user_id, friend_id)
             message = 'Friend request accepted'
         else:
             # Reject by deleting the pending request
@@ -83,6 +91,7 @@ def respond_to_request(friend_id):
                 )
             )
             db.session.commit()
+            friend_index.request_rejected(friend_id, current_user_id)
             message = 'Friend request rejected'
         
         return jsonify({'message': message}), 200
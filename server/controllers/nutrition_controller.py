@@ -2,52 +2,81 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.nutrition import NutritionPlan
 from models.user import User
+from models.resource_version import ResourceVersion
 from app import db
+from services.profile_loader import invalidate_profile
+from services.author_cards import cards_for
 from datetime import datetime
+from utils.conditional import conditional, current_validator
+from services.cache import memoize, invalidate
 
 nutrition_bp = Blueprint('nutrition', __name__)
 
-# Get all nutrition plans (public)
-@nutrition_bp.route('/', methods=['GET'])
-def get_nutrition_plans():
-    try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        search = request.args.get('search', '').strip()
+# Cached per search/page and collection validator; plan writes drop the 'nutrition' tag
+@memoize('nutrition', tags=('nutrition',))
+def _plan_page(validator, search, page, per_page):
+    query = NutritionPlan.query
 
-        query = NutritionPlan.query
+    if search:
+        query = query.filter(NutritionPlan.name.ilike(f'%{search}%'))
 
-        if search:
-            query = query.filter(NutritionPlan.name.ilike(f'%{search}%'))
+    plans = query.order_by(
+        NutritionPlan.created_at.desc()
+    ).paginate(
+        page=page,
+        per_page=per_page,
+        error_out=False
+    )
 
-        plans = query.order_by(
-            NutritionPlan.created_at.desc()
-        ).paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+    authors = cards_for(plans.items, fields=('id', 'username'))
 
-        return jsonify({
-            'plans': [{
-                'id': p.id,
-                'name': p.name,
-                'image_url': p.image_url,
-                'description': p.description,
-                'calories': p.calories,
-                'protein': p.protein,
-                'carbs': p.carbs,
-                'fats': p.fats,
-                'created_at': p.created_at.isoformat(),
-                'user': {
-                    'id': p.user.id,
-                    'username': p.user.username
-                }
-            } for p in plans.items],
-            'total': plans.total,
-            'pages': plans.pages,
-            'current_page': plans.page
-        }), 200
+    return {
+        'plans': [{
+            'id': p.id,
+            'name': p.name,
+            'image_url': p.image_url,
+            'description': p.description,
+            'calories': p.calories,
+            'protein': p.protein,
+            'carbs': p.carbs,
+            'fats': p.fats,
+            'created_at': p.created_at,
+            'user': authors[p.user_id]
+        } for p in plans.items],
+        'total': plans.total,
+        'pages': plans.pages,
+        'current_page': plans.page
+    }
+
+@memoize('nutrition', tags=('nutrition',))
+def _plan_detail(validator, plan_id):
+    plan = NutritionPlan.query.get(plan_id)
+    if not plan:
+        return None
+    return {
+        'id': plan.id,
+        'name': plan.name,
+        'image_url': plan.image_url,
+        'description': plan.description,
+        'calories': plan.calories,
+        'protein': plan.protein,
+        'carbs': plan.carbs,
+        'fats': plan.fats,
+        'created_at': plan.created_at,
+        'user': cards_for([plan], fields=('id', 'username'))[plan.user_id]
+    }
+
+# Get all nutrition plans (public)
+@nutrition_bp.route('/', methods=['GET'])
+@conditional('nutrition', NutritionPlan)
+def get_nutrition_plans():
+    try:
+        return jsonify(_plan_page(
+            current_validator(),
+            request.args.get('search', '').strip(),
+            request.args.get('page', 1, type=int),
+            request.args.get('per_page', 10, type=int)
+        )), 200
     except Exception as e:
         return jsonify({'message': f"Error fetching nutrition plans: {str(e)}"}), 500
 
@@ -73,7 +102,7 @@ def get_user_nutrition_plans():
             'protein': p.protein,
             'carbs': p.carbs,
             'fats': p.fats,
-            'created_at': p.created_at.isoformat()
+            'created_at': p.created_at
         } for p in plans]), 200
     except Exception as e:
         return jsonify({'message': f"Error fetching your nutrition plans: {str(e)}"}), 500
@@ -101,7 +130,9 @@ def create_nutrition_plan():
             user_id=current_user_id
         )
         db.session.add(plan)
+        ResourceVersion.bump('nutrition')
         db.session.commit()
+        invalidate('nutrition')
         
         return jsonify({
             'message': 'Nutrition plan created successfully',
@@ -118,27 +149,14 @@ def create_nutrition_plan():
 
 # Get single nutrition plan
 @nutrition_bp.route('/<int:plan_id>', methods=['GET'])
+@conditional('nutrition', NutritionPlan)
 def get_nutrition_plan(plan_id):
     try:
-        plan = NutritionPlan.query.get(plan_id)
+        plan = _plan_detail(current_validator(), plan_id)
         if not plan:
             return jsonify({'message': 'Nutrition plan not found'}), 404
         
-        return jsonify({
-            'id': plan.id,
-            'name': plan.name,
-            'image_url': plan.image_url,
-            'description': plan.description,
-            'calories': plan.calories,
-            'protein': plan.protein,
-            'carbs': plan.carbs,
-            'fats': plan.fats,
-            'created_at': plan.created_at.isoformat(),
-            'user': {
-                'id': plan.user.id,
-                'username': plan.user.username
-            }
-        }), 200
+        return jsonify(plan), 200
     except Exception as e:
         return jsonify({'message': f"Error fetching nutrition plan: {str(e)}"}), 500
     
@@ -156,6 +174,7 @@ def save_recipe(recipe_id):
     if recipe not in user.saved_recipes:
         user.saved_recipes.append(recipe)
         db.session.commit()
+        invalidate_profile(user_id)
 
     return jsonify({'message': 'Recipe saved successfully'}), 200
 
@@ -184,7 +203,9 @@ def update_nutrition_plan(plan_id):
         if 'carbs' in data: plan.carbs = data['carbs']
         if 'fats' in data: plan.fats = data['fats']
         
+        ResourceVersion.bump('nutrition')
         db.session.commit()
+        invalidate('nutrition')
         return jsonify({
             'message': 'Nutrition plan updated successfully',
             'plan': {
@@ -212,7 +233,9 @@ def delete_nutrition_plan(plan_id):
 
     try:
         db.session.delete(plan)
+        ResourceVersion.bump('nutrition')
         db.session.commit()
+        invalidate('nutrition')
         return jsonify({'message': 'Nutrition plan deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
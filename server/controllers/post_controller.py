@@ -1,51 +1,75 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.post import Post
+from models.post import Post, post_likes
 from app import db
 from models.user import User
+from services.profile_loader import invalidate_profile
 from datetime import datetime
-from sqlalchemy import or_
 from sqlalchemy.orm import joinedload
+from utils.pagination import keyset_page, InvalidCursor
+from services import post_search, timeline
+from services.author_cards import cards_for
 
 post_bp = Blueprint('posts', __name__)
 
-# Get all community posts with pagination and search
+def _feed_items(posts):
+    # Authors are loaded in one grouped query instead of lazily per post
+    authors = cards_for(posts)
+    return [{
+        'id': p.id,
+        'content': p.content,
+        'likes': p.likes,
+        'created_at': p.created_at,
+        'user': authors[p.user_id]
+    } for p in posts]
+
+# Get all community posts with pagination and search.
+# Passing `cursor` (empty for the first page) switches to keyset paging on
+# (created_at, id): no OFFSET and no COUNT unless include_total=true.
+# Search results are relevance-ranked in page mode and chronological in
+# cursor mode.
 @post_bp.route('/', methods=['GET'])
 def get_posts():
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         search = request.args.get('search', '').strip()
+        cursor = request.args.get('cursor')
         
-        base_query = Post.query.order_by(Post.created_at.desc())
+        base_query = Post.query
+        relevance = []
         
         if search:
-            base_query = base_query.join(User).filter(
-                or_(
-                    Post.content.ilike(f'%{search}%'),
-                    User.username.ilike(f'%{search}%')
+            base_query, relevance = post_search.apply_search(base_query, search)
+
+        if cursor is not None:
+            per_page = max(1, min(per_page, 100))
+            try:
+                items, next_cursor = keyset_page(
+                    base_query,
+                    (Post.created_at, Post.id),
+                    cursor=cursor,
+                    limit=per_page
                 )
-            )
+            except InvalidCursor as e:
+                return jsonify({'message': str(e)}), 400
+
+            response = {
+                'posts': _feed_items(items),
+                'next_cursor': next_cursor
+            }
+            if request.args.get('include_total', 'false').lower() == 'true':
+                response['total'] = base_query.order_by(None).count()
+            return jsonify(response), 200
         
-        posts = base_query.paginate(
+        posts = base_query.order_by(*relevance, Post.created_at.desc()).paginate(
             page=page,
             per_page=per_page,
             error_out=False
         )
         
         return jsonify({
-            'posts': [{
-                'id': p.id,
-                'content': p.content,
-                'likes': p.likes,
-                'created_at': p.created_at.isoformat(),
-                'user': {
-                    'id': p.user.id,
-                    'username': p.user.username,
-                    'avatar': p.user.avatar,
-                    'bio': p.user.bio
-                }
-            } for p in posts.items],
+            'posts': _feed_items(posts.items),
             'total': posts.total,
             'pages': posts.pages,
             'current_page': posts.page
@@ -53,6 +77,30 @@ def get_posts():
     except Exception as e:
         return jsonify({'message': f"Error fetching posts: {str(e)}"}), 500
 
+# Get posts from the current user's friends, newest first (cursor paged)
+@post_bp.route('/timeline', methods=['GET'])
+@jwt_required()
+def get_timeline():
+    current_user_id = get_jwt_identity()
+    
+    try:
+        per_page = max(1, min(request.args.get('per_page', 10, type=int), 100))
+        try:
+            items, next_cursor = timeline.timeline_page(
+                current_user_id,
+                cursor=request.args.get('cursor'),
+                limit=per_page
+            )
+        except InvalidCursor as e:
+            return jsonify({'message': str(e)}), 400
+        
+        return jsonify({
+            'posts': _feed_items(items),
+            'next_cursor': next_cursor
+        }), 200
+    except Exception as e:
+        return jsonify({'message': f"Error fetching timeline: {str(e)}"}), 500
+
 # Create a new post
 @post_bp.route('/', methods=['POST'])
 @jwt_required()
@@ -70,7 +118,11 @@ def create_post():
             likes=0  # Initialize likes to 0
         )
         db.session.add(post)
+        db.session.flush()
+        User.increment_counter(current_user_id, User.post_count)
+        timeline.fan_out_post(post)
         db.session.commit()
+        invalidate_profile(current_user_id)
         
         post = Post.query.options(joinedload(Post.user)).get(post.id)
 
@@ -89,21 +141,43 @@ def like_post(post_id):
     current_user_id = get_jwt_identity()
     
     try:
-        post = Post.query.get(post_id)
-        if not post:
+        liked, likes = Post.add_like(post_id, current_user_id)
+        if likes is None:
+            db.session.rollback()
             return jsonify({'message': 'Post not found'}), 404
         
-        post.likes += 1
         db.session.commit()
         
         return jsonify({
-            'message': 'Post liked successfully',
-            'likes': post.likes
+            'message': 'Post liked successfully' if liked else 'Post already liked',
+            'likes': likes
         }), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f"Error liking post: {str(e)}"}), 500
 
+# Unlike a post
+@post_bp.route('/<int:post_id>/like', methods=['DELETE'])
+@jwt_required()
+def unlike_post(post_id):
+    current_user_id = get_jwt_identity()
+    
+    try:
+        removed, likes = Post.remove_like(post_id, current_user_id)
+        if likes is None:
+            db.session.rollback()
+            return jsonify({'message': 'Post not found'}), 404
+        
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Post unliked successfully' if removed else 'Post was not liked',
+            'likes': likes
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f"Error unliking post: {str(e)}"}), 500
+
 # Get posts by a specific user
 @post_bp.route('/user/<username>', methods=['GET'])
 def get_user_posts(username):
@@ -122,7 +196,7 @@ def get_user_posts(username):
             'id': p.id,
             'content': p.content,
             'likes': p.likes,
-            'created_at': p.created_at.isoformat()
+            'created_at': p.created_at
         } for p in posts]), 200
     except Exception as e:
         return jsonify({'message': f"Error fetching user posts: {str(e)}"}), 500
@@ -142,8 +216,12 @@ def delete_post(post_id):
         if not post:
             return jsonify({'message': 'Post not found or unauthorized'}), 404
         
+        db.session.execute(post_likes.delete().where(post_likes.c.post_id == post.id))
+        timeline.remove_post(post.id)
         db.session.delete(post)
+        User.increment_counter(post.user_id, User.post_count, -1)
         db.session.commit()
+        invalidate_profile(current_user_id)
         return jsonify({'message': 'Post deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
@@ -162,12 +240,8 @@ def get_post(post_id):
                 'id': post.id,
                 'content': post.content,
                 'likes': post.likes,
-                'created_at': post.created_at.isoformat(),
-                'user': {
-                    'id': post.user.id,
-                    'username': post.user.username,
-                    'avatar': post.user.avatar
-                }
+                'created_at': post.created_at,
+                'user': cards_for([post], fields=('id', 'username', 'avatar'))[post.user_id]
             }
         }), 200
     except Exception as e:
@@ -1,71 +1,82 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.product import Product
+from models.resource_version import ResourceVersion
 from app import db
 from models.user import User
 from datetime import datetime
+from utils.conditional import conditional, current_validator
+from services.cache import memoize, invalidate
 
 product_bp = Blueprint('products', __name__)
 
+def _product_dict(p):
+    return {
+        'id': p.id,
+        'name': p.name,
+        'features': p.features,
+        'price': p.price,
+        'category': p.category,
+        'image_url': p.image_url,
+        'created_at': p.created_at
+    }
+
+# Cached per filter/page and collection validator; product writes drop the 'products' tag
+@memoize('products', tags=('products',))
+def _product_page(validator, category, search, page, per_page):
+    query = Product.query
+
+    # Apply filters
+    if category:
+        query = query.filter_by(category=category)
+    if search:
+        query = query.filter(Product.name.ilike(f'%{search}%'))
+
+    products = query.order_by(
+        Product.created_at.desc()
+    ).paginate(
+        page=page,
+        per_page=per_page,
+        error_out=False
+    )
+
+    return {
+        'products': [_product_dict(p) for p in products.items],
+        'total': products.total,
+        'pages': products.pages,
+        'current_page': products.page
+    }
+
+@memoize('products', tags=('products',))
+def _product_detail(validator, product_id):
+    product = Product.query.get(product_id)
+    return _product_dict(product) if product else None
+
 # Get all products with filtering
 @product_bp.route('/', methods=['GET'])
+@conditional('products', Product)
 def get_products():
     try:
-        category = request.args.get('category')
-        search = request.args.get('search', '').strip()
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-
-        query = Product.query
-
-        # Apply filters
-        if category:
-            query = query.filter_by(category=category)
-        if search:
-            query = query.filter(Product.name.ilike(f'%{search}%'))
-
-        products = query.order_by(
-            Product.created_at.desc()
-        ).paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
-
-        return jsonify({
-            'products': [{
-                'id': p.id,
-                'name': p.name,
-                'features': p.features,
-                'price': p.price,
-                'category': p.category,
-                'image_url': p.image_url,
-                'created_at': p.created_at.isoformat()
-            } for p in products.items],
-            'total': products.total,
-            'pages': products.pages,
-            'current_page': products.page
-        }), 200
+        return jsonify(_product_page(
+            current_validator(),
+            request.args.get('category'),
+            request.args.get('search', '').strip(),
+            request.args.get('page', 1, type=int),
+            request.args.get('per_page', 10, type=int)
+        )), 200
     except Exception as e:
         return jsonify({'message': f"Error fetching products: {str(e)}"}), 500
 
 # Get single product
 @product_bp.route('/<int:product_id>', methods=['GET'])
+@conditional('products', Product)
 def get_product(product_id):
     try:
-        product = Product.query.get(product_id)
+        product = _product_detail(current_validator(), product_id)
         if not product:
             return jsonify({'message': 'Product not found'}), 404
         
-        return jsonify({
-            'id': product.id,
-            'name': product.name,
-            'features': product.features,
-            'price': product.price,
-            'category': product.category,
-            'image_url': product.image_url,
-            'created_at': product.created_at.isoformat()
-        }), 200
+        return jsonify(product), 200
     except Exception as e:
         return jsonify({'message': f"Error fetching product: {str(e)}"}), 500
 
@@ -94,7 +105,9 @@ def create_product():
             image_url=data.get('image_url', '')
         )
         db.session.add(product)
+        ResourceVersion.bump('products')
         db.session.commit()
+        invalidate('products')
         
         return jsonify({
             'message': 'Product created successfully',
@@ -131,7 +144,9 @@ def update_product(product_id):
         if 'category' in data: product.category = data['category']
         if 'image_url' in data: product.image_url = data['image_url']
         
+        ResourceVersion.bump('products')
         db.session.commit()
+        invalidate('products')
         return jsonify({
             'message': 'Product updated successfully',
             'product': {
@@ -160,7 +175,9 @@ def delete_product(product_id):
 
     try:
         db.session.delete(product)
+        ResourceVersion.bump('products')
         db.session.commit()
+        invalidate('products')
         return jsonify({'message': 'Product deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
@@ -1,7 +1,8 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.user import User, user_friends
-from app import db
+from models.user import User
+from services import friend_suggestions
+from services.user_serializer import serialize_users
 
 user_bp = Blueprint('users', __name__)
 
@@ -14,31 +15,8 @@ def suggest_friends():
     if not current_user:
         return jsonify({'message': 'User not found'}), 404
 
-    # Get only accepted friends
-    accepted_subquery = db.session.query(user_friends.c.friend_id).filter(
-        user_friends.c.user_id == current_user_id,
-        user_friends.c.status == 'accepted'
-    ).union(
-        db.session.query(user_friends.c.user_id).filter(
-            user_friends.c.friend_id == current_user_id,
-            user_friends.c.status == 'accepted'
-        )
-    )
-
-    accepted_ids = set([r[0] for r in accepted_subquery])
-    accepted_ids.add(current_user_id)
-
-    suggestions = User.query.filter(~User.id.in_(accepted_ids)).limit(10).all()
-
-    result = [{
-        'id': u.id,
-        'username': u.username,
-        'avatar': u.avatar,
-        'mutualFriends': len(
-            set(f.id for f in u.get_friends()) &
-            set(f.id for f in current_user.get_friends())
-        )
-    } for u in suggestions]
+    limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+    result = friend_suggestions.suggest_friends(current_user.id, limit=limit)
 
     return jsonify({'data': {'users': result}}), 200
 
@@ -47,7 +25,7 @@ def suggest_friends():
 @user_bp.route('/users', methods=['GET'])
 def get_all_users():
     users = User.query.all()
-    return jsonify([u.to_dict() for u in users]), 200
+    return jsonify(serialize_users(users)), 200
 
 # (Optional) Get a specific user by ID
 @user_bp.route('/users/<int:user_id>', methods=['GET'])
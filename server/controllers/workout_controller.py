@@ -1,7 +1,16 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.workout import Workout
+from models.workout_session import WorkoutSession
+from models.user import User
+from models.exercise import workout_exercises
+from models.resource_version import ResourceVersion
+from utils.pagination import keyset_page, InvalidCursor
+from utils.conditional import conditional
+from services import exercise_catalog, workout_stats, training_load
+from datetime import datetime
 from app import db
+from services.profile_loader import invalidate_profile
 
 workout_bp = Blueprint('workouts', __name__)
 
@@ -15,7 +24,7 @@ def create_workout():
     
     try:
         workout = Workout(
-            video_url=data('video_url'),
+            video_url=data.get('video_url'),
             name=data['name'],
             description=data.get('description', ''),
             duration=data['duration'],
@@ -24,21 +33,74 @@ def create_workout():
             user_id=current_user_id
         )
         db.session.add(workout)
+        db.session.flush()
+        exercise_catalog.sync_workout_exercises(workout)
+        User.increment_counter(current_user_id, User.workout_count)
+        ResourceVersion.bump('workouts')
         db.session.commit()
+        invalidate_profile(current_user_id)
         return jsonify(workout.to_dict()), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': str(e)}), 400
 
+# List workouts newest first, one bounded page at a time.
+# Filters: difficulty (comma separated), min_duration, max_duration, user_id,
+# exercise (comma separated, with match=any|all). The body stays a plain array; the cursor for the next page is
+# returned in the X-Next-Cursor header.
 @workout_bp.route('/', methods=['GET'])
+@conditional('workouts', Workout, count=False)
 def get_workouts():
     try:
-        workouts = Workout.query.order_by(Workout.created_at.desc()).all()
-        return jsonify([workout.to_dict() for workout in workouts]), 200
+        per_page = max(1, min(request.args.get('per_page', 50, type=int), 100))
+        difficulty = request.args.get('difficulty', '').strip()
+        min_duration = request.args.get('min_duration', type=int)
+        max_duration = request.args.get('max_duration', type=int)
+        user_id = request.args.get('user_id', type=int)
+        exercise = request.args.get('exercise', '').strip()
+        match = 'all' if request.args.get('match') == 'all' else 'any'
+
+        query = Workout.query
+        if difficulty:
+            query = query.filter(Workout.difficulty.in_(
+                [d.strip() for d in difficulty.split(',') if d.strip()]
+            ))
+        if min_duration is not None:
+            query = query.filter(Workout.duration >= min_duration)
+        if max_duration is not None:
+            query = query.filter(Workout.duration <= max_duration)
+        if user_id is not None:
+            query = query.filter(Workout.user_id == user_id)
+        if exercise:
+            query = exercise_catalog.filter_by_exercises(query, exercise.split(','), match)
+
+        try:
+            workouts, next_cursor = keyset_page(
+                query,
+                (Workout.created_at, Workout.id),
+                cursor=request.args.get('cursor'),
+                limit=per_page
+            )
+        except InvalidCursor as e:
+            return jsonify({'message': str(e)}), 400
+
+        response = jsonify([workout.to_dict() for workout in workouts])
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
     except Exception as e:
         return jsonify({'message': f'Error fetching workouts: {str(e)}'}), 500
 
 
+def _profiles_showing(workout):
+    # The owner plus everyone who logged it: their profiles list its name
+    logged_by = db.session.execute(
+        db.select(WorkoutSession.user_id)
+        .where(WorkoutSession.workout_id == workout.id)
+        .distinct()
+    ).scalars().all()
+    return {workout.user_id, *logged_by}
+
 @workout_bp.route('/<int:workout_id>', methods=['GET', 'PUT', 'DELETE'])
 @jwt_required()
 def workout_detail(workout_id):
@@ -58,7 +120,12 @@ def workout_detail(workout_id):
             if 'description' in data: workout.description = data['description']
             if 'duration' in data: workout.duration = data['duration']
             if 'calories_burned' in data: workout.calories_burned = data['calories_burned']
+            if 'exercises' in data:
+                workout.exercises = data['exercises']
+                exercise_catalog.sync_workout_exercises(workout)
+            ResourceVersion.bump('workouts')
             db.session.commit()
+            invalidate_profile(*_profiles_showing(workout))
             return jsonify(workout.to_dict())
         except Exception as e:
             db.session.rollback()
@@ -66,9 +133,128 @@ def workout_detail(workout_id):
     
     elif request.method == 'DELETE':
         try:
+            affected = _profiles_showing(workout)
+            db.session.execute(
+                workout_exercises.delete().where(workout_exercises.c.workout_id == workout.id)
+            )
+            db.session.execute(
+                db.update(WorkoutSession)
+                .where(WorkoutSession.workout_id == workout.id)
+                .values(workout_id=None)
+            )
             db.session.delete(workout)
+            User.increment_counter(workout.user_id, User.workout_count, -1)
+            ResourceVersion.bump('workouts')
             db.session.commit()
+            invalidate_profile(*affected)
             return jsonify({'message': 'Workout deleted'}), 200
         except Exception as e:
             db.session.rollback()
-            return jsonify({'message': str(e)}), 400
\ No newline at end of file
+            return jsonify({'message': str(e)}), 400
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+# Log that the current user performed a workout
+@workout_bp.route('/<int:workout_id>/sessions', methods=['POST'])
+@jwt_required()
+def log_session(workout_id):
+    current_user_id = get_jwt_identity()
+    data = request.get_json() or {}
+    
+    if not Workout.query.get(workout_id):
+        return jsonify({'message': 'Workout not found'}), 404
+    
+    try:
+        started_at = datetime.fromisoformat(data['started_at']) if data.get('started_at') else datetime.utcnow()
+        duration = int(data.get('duration') or 0)
+        if duration <= 0:
+            return jsonify({'message': 'Duration must be a positive number of minutes'}), 400
+        
+        session = WorkoutSession(
+            user_id=current_user_id,
+            workout_id=workout_id,
+            started_at=started_at,
+            duration=duration,
+            sets=data.get('sets'),
+            reps=data.get('reps'),
+            load=data.get('load')
+        )
+        workout_stats.record_session(session)
+        db.session.commit()
+        invalidate_profile(current_user_id)
+        return jsonify(session.to_dict()), 201
+    except (TypeError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 500
+
+# List the current user's sessions, newest first (cursor paged)
+@workout_bp.route('/sessions', methods=['GET'])
+@jwt_required()
+def get_sessions():
+    current_user_id = get_jwt_identity()
+    per_page = max(1, min(request.args.get('per_page', 20, type=int), 100))
+    
+    try:
+        sessions, next_cursor = keyset_page(
+            WorkoutSession.query.filter_by(user_id=current_user_id),
+            (WorkoutSession.started_at, WorkoutSession.id),
+            cursor=request.args.get('cursor'),
+            limit=per_page
+        )
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
+    
+    return jsonify({
+        'sessions': [s.to_dict() for s in sessions],
+        'next_cursor': next_cursor
+    }), 200
+
+@workout_bp.route('/sessions/<int:session_id>', methods=['DELETE'])
+@jwt_required()
+def delete_session(session_id):
+    current_user_id = get_jwt_identity()
+    session = WorkoutSession.query.filter_by(id=session_id, user_id=current_user_id).first()
+    if not session:
+        return jsonify({'message': 'Session not found'}), 404
+    
+    try:
+        workout_stats.remove_session(session)
+        db.session.commit()
+        invalidate_profile(current_user_id)
+        return jsonify({'message': 'Session deleted'}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+
+# Weekly/monthly training totals for the current user
+@workout_bp.route('/stats', methods=['GET'])
+@jwt_required()
+def get_stats():
+    current_user_id = get_jwt_identity()
+    period = request.args.get('period', 'week')
+    if period not in ('week', 'month'):
+        return jsonify({'message': 'period must be week or month'}), 400
+    
+    try:
+        start = _parse_date(request.args.get('start'))
+        end = _parse_date(request.args.get('end'))
+    except ValueError:
+        return jsonify({'message': 'Dates must be YYYY-MM-DD'}), 400
+    
+    return jsonify(workout_stats.workout_stats(current_user_id, period, start, end)), 200
+
+# Rolling training-load metrics (acute:chronic ratio, monotony, streaks)
+@workout_bp.route('/analytics', methods=['GET'])
+@jwt_required()
+def get_training_load():
+    current_user_id = get_jwt_identity()
+    
+    try:
+        start, end = training_load.range_from_args(request.args)
+        return jsonify(training_load.user_training_load(current_user_id, start, end)), 200
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
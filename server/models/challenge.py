@@ -28,6 +28,12 @@ class UserChallenge(db.Model, SerializerMixin):
     completed = db.Column(db.Boolean, default=False)
     joined_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Leaderboard order is (progress DESC, id); this index also serves
+    # per-challenge participant counts
+    __table_args__ = (
+        db.Index('ix_user_challenges_leaderboard', challenge_id, progress.desc(), id),
+    )
+
     # Relationships
     user = db.relationship('User', back_populates='challenges')
     challenge = db.relationship('Challenge')
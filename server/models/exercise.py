@@ -0,0 +1,44 @@
+import re
+from app import db
+
+# Which exercises a workout includes, in the order they were listed
+workout_exercises = db.Table('workout_exercises',
+    db.Column('workout_id', db.Integer, db.ForeignKey('workouts.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('exercise_id', db.Integer, db.ForeignKey('exercises.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('position', db.Integer, nullable=False, default=0),
+    # Inverted index: exercise -> workouts
+    db.Index('ix_workout_exercises_exercise_id', 'exercise_id', 'workout_id')
+)
+
+
+def exercise_slug(name):
+    """Normalize an exercise name so "Push-ups", "push up" and "PUSH UPS" match"""
+    words = re.sub(r"[^a-z0-9]+", ' ', name.lower().replace("'", '')).split()
+    return ' '.join(
+        w[:-1] if len(w) > 2 and w.endswith('s') and not w.endswith('ss') else w
+        for w in words
+    )
+
+
+def parse_exercises(text):
+    """Split the free-text Workout.exercises column into clean names"""
+    if not text:
+        return []
+    return [part.strip() for part in text.split(',') if exercise_slug(part)]
+
+
+class Exercise(db.Model):
+    __tablename__ = 'exercises'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    slug = db.Column(db.String(100), nullable=False, unique=True)
+
+    def __repr__(self):
+        return f'<Exercise {self.name}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name
+        }
@@ -0,0 +1,19 @@
+from app import db
+from datetime import datetime
+
+class FeedEntry(db.Model):
+    """A post fanned out to one reader's friends timeline"""
+    __tablename__ = "feed_entries"
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)  # reader
+    post_id = db.Column(db.Integer, db.ForeignKey('posts.id'), primary_key=True)
+    author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_feed_entries_user_created', 'user_id', 'created_at', 'post_id'),
+        db.Index('ix_feed_entries_post_id', 'post_id'),
+    )
+
+    def __repr__(self):
+        return f'<FeedEntry {self.user_id} <- {self.post_id}>'
@@ -1,6 +1,15 @@
 from app import db
 from datetime import datetime
 from sqlalchemy_serializer import SerializerMixin
+from sqlalchemy.exc import IntegrityError
+from utils.sql import insert_ignore
+
+# One row per (post, user) so a like is idempotent
+post_likes = db.Table('post_likes',
+    db.Column('post_id', db.Integer, db.ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('user_id', db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('created_at', db.DateTime, default=datetime.utcnow)
+)
 
 class Post(db.Model, SerializerMixin):
     __tablename__ = "posts"
@@ -10,24 +19,82 @@ class Post(db.Model, SerializerMixin):
     likes = db.Column(db.Integer, default=0)
     comments_count = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
 
     # Relationships
     user = db.relationship('User', back_populates='posts')
 
+    # Keyset pagination for the feed walks (created_at, id) backwards
+    __table_args__ = (
+        db.Index('ix_posts_created_at_id', 'created_at', 'id'),
+        # Timeline pulls of one author's newest posts
+        db.Index('ix_posts_user_created_id', 'user_id', 'created_at', 'id'),
+    )
+
     # Serialization rules
     serialize_rules = ('-user.posts', '-user.password_hash')
 
     def __repr__(self):
         return f'<Post {self.id} by User {self.user_id}>'
 
+    @staticmethod
+    def add_like(post_id, user_id):
+        """Record a like and bump the counter in SQL; the caller commits.
+
+        Returns (liked, likes): liked is False if the user had already liked
+        the post, likes is None if the post doesn't exist.
+        """
+        try:
+            result = db.session.execute(
+                insert_ignore(post_likes).values(post_id=post_id, user_id=user_id)
+            )
+        except IntegrityError:
+            # Foreign key violation: the post doesn't exist
+            return False, None
+        if result.rowcount == 0:
+            likes = db.session.execute(
+                db.select(Post.likes).where(Post.id == post_id)
+            ).scalar()
+            return False, likes
+
+        likes = db.session.execute(
+            db.update(Post)
+            .where(Post.id == post_id)
+            .values(likes=Post.likes + 1)
+            .returning(Post.likes)
+        ).scalar()
+        return True, likes
+
+    @staticmethod
+    def remove_like(post_id, user_id):
+        """Undo a like; returns (removed, likes) like add_like"""
+        result = db.session.execute(
+            post_likes.delete().where(
+                (post_likes.c.post_id == post_id) &
+                (post_likes.c.user_id == user_id)
+            )
+        )
+        if result.rowcount == 0:
+            likes = db.session.execute(
+                db.select(Post.likes).where(Post.id == post_id)
+            ).scalar()
+            return False, likes
+
+        likes = db.session.execute(
+            db.update(Post)
+            .where(Post.id == post_id)
+            .values(likes=Post.likes - 1)
+            .returning(Post.likes)
+        ).scalar()
+        return True, likes
+
     def to_dict(self):
         return {
             'id': self.id,
             'content': self.content,
             'likes': self.likes,
             'comments': self.comments_count,
-            'created_at': self.created_at.isoformat(),
+            'created_at': self.created_at,
             'user': {
                 'id': self.user.id,
                 'username': self.user.username,
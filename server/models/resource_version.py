@@ -0,0 +1,32 @@
+from app import db
+from datetime import datetime
+from utils.sql import dialect_insert
+
+
+class ResourceVersion(db.Model):
+    """Write counter per public collection, used to validate conditional GETs"""
+    __tablename__ = 'resource_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    @staticmethod
+    def bump(*names):
+        """Increment the versions of `names` in the current transaction.
+
+        Call this from every write path that changes what a collection
+        endpoint returns; commit with the write itself so other workers never
+        see the new rows under an old validator.
+        """
+        now = datetime.utcnow()
+        table = ResourceVersion.__table__
+        for name in names:
+            stmt = dialect_insert(table).values(name=name, version=1, updated_at=now)
+            db.session.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.name],
+                set_={'version': table.c.version + 1, 'updated_at': now}
+            ))
+
+    def __repr__(self):
+        return f'<ResourceVersion {self.name} v{self.version}>'
@@ -1,15 +1,19 @@
 from datetime import datetime
 from app import db
 from app import bcrypt
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import validates
 from sqlalchemy_serializer import SerializerMixin
+from services.friend_index import friend_index
 
 # Association table for User-Friends (many-to-many)
 user_friends = db.Table('user_friends',
     db.Column('user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
     db.Column('friend_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
     db.Column('created_at', db.DateTime, default=datetime.utcnow),
-    db.Column('status', db.String(20), default='pending')  # 'pending', 'accepted', 'rejected'
+    db.Column('status', db.String(20), default='pending'),  # 'pending', 'accepted', 'rejected'
+    # Reverse lookups ("who added me") for friend-of-friend queries
+    db.Index('ix_user_friends_friend_id_status', 'friend_id', 'status')
 )
 
 
@@ -32,6 +36,14 @@ class User(db.Model, SerializerMixin):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_active = db.Column(db.DateTime, default=datetime.utcnow)
     is_admin = db.Column(db.Boolean, default=False)  
+
+    # Denormalized counters, maintained by the workout/post write paths
+    # (run `flask reconcile-counters` to rebuild them)
+    workout_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    post_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Set once a user has too many friends to fan their posts out on write
+    feed_fanout_on_read = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
     
     # Relationships
     workouts = db.relationship('Workout', back_populates='user', lazy='dynamic',
@@ -108,86 +120,106 @@ class User(db.Model, SerializerMixin):
     def send_friend_request(self, friend):
         if self.id == friend.id:
             raise ValueError("Cannot add yourself as friend")
-        if self.is_friends_with(friend):
+        # Checked against the table, not the index: another worker's index
+        # may not have seen a request sent moments ago
+        if self.friendship_exists(friend):
+            friend_index.invalidate(self.id)
+            friend_index.invalidate(friend.id)
             raise ValueError("Already friends or request pending")
         
-        db.session.execute(
-            user_friends.insert().values(
-                user_id=self.id,
-                friend_id=friend.id,
-                status='pending'
+        try:
+            db.session.execute(
+                user_friends.insert().values(
+                    user_id=self.id,
+                    friend_id=friend.id,
+                    status='pending'
+                )
             )
-        )
-        db.session.commit()
+            db.session.commit()
+        except IntegrityError:
+            # Lost a race with the same request from another worker
+            db.session.rollback()
+            raise ValueError("Already friends or request pending")
+        friend_index.request_sent(self.id, friend.id)
     
     def accept_friend_request(self, friend):
-        relationship = db.session.execute(
-            db.select(user_friends).where(
+        # A friendship is a single accepted row; readers treat it as undirected
+        result = db.session.execute(
+            user_friends.update().where(
                 (user_friends.c.user_id == friend.id) &
                 (user_friends.c.friend_id == self.id) &
                 (user_friends.c.status == 'pending')
-        ).first())
-        
-        if not relationship:
-            raise ValueError("No pending friend request from this user")
-        
-        # Update both directions
-        db.session.execute(
-            user_friends.update().where(
-                (user_friends.c.user_id == friend.id) &
-                (user_friends.c.friend_id == self.id)
             ).values(status='accepted'))
         
-        db.session.execute(
-            user_friends.insert().values(
-                user_id=self.id,
-                friend_id=friend.id,
-                status='accepted'
-            )
-        )
+        if result.rowcount == 0:
+            db.session.rollback()
+            raise ValueError("No pending friend request from this user")
+
+        # services.timeline imports this module, so resolve it lazily
+        from services import timeline
+        timeline.backfill_friendship(self.id, friend.id)
         db.session.commit()
+        friend_index.request_accepted(self.id, friend.id)
     
     def is_friends_with(self, friend):
-        result = db.session.execute(
-            db.select(user_friends).where(
+        return friend_index.is_related(self.id, friend.id)
+
+    def friendship_exists(self, friend):
+        """Authoritative version of is_friends_with: any row linking the two users"""
+        return db.session.execute(
+            db.select(db.exists().where(
                 ((user_friends.c.user_id == self.id) & (user_friends.c.friend_id == friend.id)) |
                 ((user_friends.c.user_id == friend.id) & (user_friends.c.friend_id == self.id))
-            )
-        ).first()
-        return result is not None
+            ))
+        ).scalar()
 
-    
-    def get_friends(self):
-    # Friends the user added
-        q1 = User.query.join(
-            user_friends,
-            (user_friends.c.friend_id == User.id)
-        ).filter(
-            user_friends.c.user_id == self.id,
-            user_friends.c.status == 'accepted'
-        )
+    def get_friend_ids(self):
+        return friend_index.friend_ids(self.id)
 
-    # Friends who added the user
-        q2 = User.query.join(
-            user_friends,
-            (user_friends.c.user_id == User.id)
-        ).filter(
-            user_friends.c.friend_id == self.id,
-            user_friends.c.status == 'accepted'
-        )
+    def get_friends(self):
+        friend_ids = self.get_friend_ids()
+        if not friend_ids:
+            return []
+        return User.query.filter(User.id.in_(friend_ids)).order_by(User.id).all()
 
-        return q1.union(q2).all()
+    def get_pending_request_ids(self):
+        return friend_index.pending_request_ids(self.id)
 
-    
     def get_pending_requests(self):
-        return User.query.join(
-            user_friends,
-            (user_friends.c.user_id == User.id) &
-            (user_friends.c.friend_id == self.id) &
-            (user_friends.c.status == 'pending')
-        ).all()
+        sender_ids = self.get_pending_request_ids()
+        if not sender_ids:
+            return []
+        return User.query.filter(User.id.in_(sender_ids)).order_by(User.id).all()
     
     # Utility methods
+    @staticmethod
+    def increment_counter(user_id, column, amount=1):
+        """Atomically adjust a counter column; the caller commits"""
+        db.session.execute(
+            db.update(User)
+            .where(User.id == user_id)
+            .values({column: column + amount})
+        )
+
+    @staticmethod
+    def reconcile_counters():
+        """Recompute workout_count and post_count for every user from source rows"""
+        from models.workout import Workout
+        from models.post import Post
+
+        workouts = db.select(db.func.count(Workout.id)).where(
+            Workout.user_id == User.id
+        ).scalar_subquery()
+        posts = db.select(db.func.count(Post.id)).where(
+            Post.user_id == User.id
+        ).scalar_subquery()
+
+        result = db.session.execute(
+            db.update(User).values(workout_count=workouts, post_count=posts)
+        )
+        db.session.commit()
+        return result.rowcount
+
     def update_last_active(self):
         self.last_active = datetime.utcnow()
         db.session.commit()
@@ -198,14 +230,14 @@ class User(db.Model, SerializerMixin):
             'username': self.username,
             'avatar': self.avatar,
             'bio': self.bio,
-            'created_at': self.created_at.isoformat(),
-            'last_active': self.last_active.isoformat(),
-            'workout_count': self.workouts.count(),
-            'post_count': self.posts.count()
+            'created_at': self.created_at,
+            'last_active': self.last_active,
+            'workout_count': self.workout_count or 0,
+            'post_count': self.post_count or 0
         }
         
         if include_relationships:
-            data['friends'] = [friend.to_dict() for friend in self.get_friends()]
-            data['pending_requests'] = [user.to_dict() for user in self.get_pending_requests()]
+            from services.user_serializer import serialize_users
+            return serialize_users([self], include_relationships=True)[0]
         
         return data
\ No newline at end of file
@@ -19,6 +19,14 @@ class Workout(db.Model, SerializerMixin):
     user = db.relationship('User', back_populates = 'workouts')
     serialize_rules=('-user.workouts',)
 
+    # Listing is keyset-paged on (created_at, id), optionally filtered
+    __table_args__ = (
+        db.Index('ix_workouts_created_at_id', 'created_at', 'id'),
+        db.Index('ix_workouts_difficulty_created_at', 'difficulty', 'created_at'),
+        db.Index('ix_workouts_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_workouts_duration', 'duration'),
+    )
+
     
     def __repr__(self):
         return f'Workout{self.name} {self.description} {self.video_url} {self.difficulty}'
@@ -33,5 +41,5 @@ class Workout(db.Model, SerializerMixin):
             'difficulty': self.difficulty,
             'duration': self.duration,
             'exercises': self.exercises,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
     }
\ No newline at end of file
@@ -0,0 +1,61 @@
+from app import db
+from datetime import datetime
+
+class WorkoutSession(db.Model):
+    """One logged performance of a workout"""
+    __tablename__ = 'workout_sessions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # Kept (as NULL) if the workout template is later deleted
+    workout_id = db.Column(db.Integer, db.ForeignKey('workouts.id', ondelete='SET NULL'))
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    duration = db.Column(db.Integer, nullable=False)  # minutes
+    sets = db.Column(db.Integer)
+    reps = db.Column(db.Integer)
+    load = db.Column(db.Float)  # kg
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    workout = db.relationship('Workout')
+
+    __table_args__ = (
+        db.Index('ix_workout_sessions_user_started', 'user_id', 'started_at', 'id'),
+        # Who logged a workout, for profile invalidation when it changes
+        db.Index('ix_workout_sessions_workout_user', 'workout_id', 'user_id'),
+    )
+
+    def __repr__(self):
+        return f'<WorkoutSession {self.id} user={self.user_id} workout={self.workout_id}>'
+
+    @property
+    def volume(self):
+        if self.sets is None or self.reps is None or self.load is None:
+            return 0
+        return self.sets * self.reps * self.load
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'workout_id': self.workout_id,
+            'started_at': self.started_at,
+            'duration': self.duration,
+            'sets': self.sets,
+            'reps': self.reps,
+            'load': self.load
+        }
+
+
+class DailyWorkoutRollup(db.Model):
+    """Per-user, per-day session totals, maintained as sessions are logged/deleted"""
+    __tablename__ = 'daily_workout_rollups'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    duration = db.Column(db.Integer, nullable=False, default=0)
+    sets = db.Column(db.Integer, nullable=False, default=0)
+    reps = db.Column(db.Integer, nullable=False, default=0)
+    volume = db.Column(db.Float, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<DailyWorkoutRollup {self.user_id} {self.day}>'
@@ -1,10 +1,11 @@
-from app import create_app, db
+from app import create_app, db, bcrypt
 from models.user import User, user_friends
 from models.workout import Workout
 from models.post import Post
 from models.challenge import Challenge, UserChallenge
 from models.nutrition import NutritionPlan
 from models.product import Product
+from services import exercise_catalog
 
 
 
@@ -336,8 +337,238 @@ def seed_database():
         seed_friendships(users)
         seed_nutrition_plans(users)
         seed_products()
+        User.reconcile_counters()
+        exercise_catalog.backfill()
         
         print("Database seeding completed successfully!")
 
+# ---------------------------------------------------------------------------
+# Bulk mode: large, reproducible datasets for load testing/benchmarks.
+#
+# Rows are generated as plain tuples with explicit ids and written in chunks
+# with executemany (or COPY on PostgreSQL), bypassing the ORM, the
+# @validates uniqueness checks and per-user bcrypt hashing.
+# ---------------------------------------------------------------------------
+
+BULK_PASSWORD = 'loadtest-password'
+
+
+def _bulk_write(table, columns, rows, use_copy):
+    """Insert an iterable of row tuples into `table` in one chunk"""
+    rows = list(rows)
+    if not rows:
+        return 0
+    if use_copy:
+        import csv
+        import io
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(['' if v is None else v.isoformat() if isinstance(v, datetime) else v for v in row])
+        buffer.seek(0)
+        cursor = db.session.connection().connection.cursor()
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    else:
+        db.session.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+    return len(rows)
+
+
+def _bulk_insert(table, columns, rows, chunk_size, use_copy, label):
+    """Stream generated rows into `table` in chunks, committing each one"""
+    total, chunk = 0, []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            total += _bulk_write(table, columns, chunk, use_copy)
+            db.session.commit()
+            chunk = []
+            print(f"  {label}: {total}")
+    total += _bulk_write(table, columns, chunk, use_copy)
+    db.session.commit()
+    print(f"  {label}: {total} done")
+    return total
+
+
+def _random_time(rng, start, end):
+    return start + timedelta(seconds=rng.randint(0, int((end - start).total_seconds())))
+
+
+def seed_bulk(num_users=10000, friends_per_user=10, num_posts=50000, likes_per_post=5,
+              num_sessions=50000, seed=42, chunk_size=10000, use_copy=None, anchor=None):
+    """Seed a large synthetic dataset deterministically from `seed`.
+
+    Timestamps fall in the year before `anchor` (default: today at midnight),
+    so the same seed and anchor always produce the same rows.
+    """
+    from models.post import post_likes
+    from models.workout_session import WorkoutSession
+    from services.workout_stats import rebuild_rollups
+
+    with app.app_context():
+        rng = random.Random(seed)
+        random.seed(seed)
+        Faker.seed(seed)
+        if use_copy is None:
+            use_copy = db.engine.dialect.name == 'postgresql'
+
+        print(f"Starting bulk seeding (seed={seed}, copy={use_copy})...")
+        db.drop_all()
+        db.create_all()
+
+        now = anchor or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        year_ago = now - timedelta(days=365)
+        password_hash = bcrypt.generate_password_hash(BULK_PASSWORD).decode('utf-8')
+        bios = [fake.sentence() for _ in range(500)]
+        contents = [fake.paragraph() for _ in range(2000)]
+        avatars = ["🏋️", "🧘", "🏊", "🚴", "🏃", "💪"]
+
+        print("Seeding users...")
+        user_columns = ('id', 'username', 'email', 'password_hash', 'avatar', 'bio',
+                        'created_at', 'last_active', 'is_admin', 'workout_count',
+                        'post_count', 'feed_fanout_on_read')
+        def users():
+            for i in range(1, num_users + 1):
+                created = _random_time(rng, year_ago, now)
+                yield (i, f'user{i:07d}', f'user{i:07d}@example.com', password_hash,
+                       rng.choice(avatars), rng.choice(bios), created,
+                       _random_time(rng, created, now), i == 1, 0, 0, False)
+        _bulk_insert(User.__table__, user_columns, users(), chunk_size, use_copy, 'users')
+
+        # Friends are drawn from a window of nearby ids so friend-of-friend
+        # overlap (mutual friends) looks like real communities. Offsets are
+        # below num_users / 2, which makes every unordered pair unique.
+        print("Seeding friendships...")
+        max_offset = max(1, min(num_users // 2 - 1, 5000))
+        def friendships():
+            for i in range(1, num_users + 1):
+                for offset in rng.sample(range(1, max_offset + 1), min(friends_per_user, max_offset)):
+                    friend = (i - 1 + offset) % num_users + 1
+                    status = 'accepted' if rng.random() < 0.85 else 'pending'
+                    yield (i, friend, _random_time(rng, year_ago, now), status)
+        if num_users > 2:
+            _bulk_insert(user_friends, ('user_id', 'friend_id', 'created_at', 'status'),
+                         friendships(), chunk_size, use_copy, 'friendships')
+
+        # Small reference tables go through the normal helpers
+        sample_users = User.query.order_by(User.id).limit(50).all()
+        seed_workouts(sample_users)
+        challenges = seed_challenges()
+        seed_nutrition_plans(sample_users)
+        seed_products()
+        workout_ids = [w.id for w in Workout.query.all()]
+
+        print("Seeding challenge participation...")
+        def participation():
+            next_id = 1
+            for user_id in range(1, num_users + 1):
+                for challenge in rng.sample(challenges, rng.randint(0, 2)):
+                    progress = rng.randint(0, challenge.target)
+                    yield (next_id, user_id, challenge.id, progress,
+                           progress >= challenge.target, _random_time(rng, year_ago, now))
+                    next_id += 1
+        _bulk_insert(UserChallenge.__table__,
+                     ('id', 'user_id', 'challenge_id', 'progress', 'completed', 'joined_at'),
+                     participation(), chunk_size, use_copy, 'user challenges')
+
+        print("Seeding posts and likes...")
+        post_columns = ('id', 'content', 'likes', 'comments_count', 'created_at', 'user_id')
+        for first in range(1, num_posts + 1, chunk_size):
+            post_rows, like_rows = [], []
+            for post_id in range(first, min(first + chunk_size, num_posts + 1)):
+                created = _random_time(rng, year_ago, now)
+                likers = rng.sample(range(1, num_users + 1),
+                                    min(num_users, rng.randint(0, 2 * likes_per_post)))
+                like_rows.extend((post_id, user_id, created) for user_id in likers)
+                post_rows.append((post_id, rng.choice(contents), len(likers),
+                                  rng.randint(0, 20), created, rng.randint(1, num_users)))
+            _bulk_write(Post.__table__, post_columns, post_rows, use_copy)
+            _bulk_write(post_likes, ('post_id', 'user_id', 'created_at'), like_rows, use_copy)
+            db.session.commit()
+            print(f"  posts: {post_rows[-1][0]}")
+
+        print("Seeding workout sessions...")
+        def sessions():
+            for session_id in range(1, num_sessions + 1):
+                sets = rng.randint(1, 5)
+                started = _random_time(rng, year_ago, now)
+                yield (session_id, rng.randint(1, num_users), rng.choice(workout_ids), started,
+                       rng.randint(15, 90), sets, rng.randint(5, 15),
+                       float(rng.choice([0, 10, 20, 40, 60])), started)
+        _bulk_insert(WorkoutSession.__table__,
+                     ('id', 'user_id', 'workout_id', 'started_at', 'duration',
+                      'sets', 'reps', 'load', 'created_at'),
+                     sessions(), chunk_size, use_copy, 'sessions')
+
+        print("Building derived data...")
+        if db.engine.dialect.name == 'postgresql':
+            for table in ('users', 'user_challenges', 'posts', 'workout_sessions'):
+                db.session.execute(db.text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+                ))
+        _fan_out_seeded_posts()
+        rebuild_rollups()
+        User.reconcile_counters()
+        exercise_catalog.backfill()
+
+        print(f"Bulk seeding completed (password for every user: {BULK_PASSWORD})")
+
+
+def _fan_out_seeded_posts():
+    """Fill feed_entries for every post with one INSERT ... SELECT"""
+    from models.feed import FeedEntry
+    from models.post import Post as P
+
+    friends = db.union(
+        db.select(user_friends.c.user_id.label('author_id'), user_friends.c.friend_id.label('reader_id'))
+        .where(user_friends.c.status == 'accepted'),
+        db.select(user_friends.c.friend_id, user_friends.c.user_id)
+        .where(user_friends.c.status == 'accepted')
+    ).subquery()
+    db.session.execute(
+        db.insert(FeedEntry).from_select(
+            ['user_id', 'post_id', 'author_id', 'created_at'],
+            db.select(friends.c.reader_id, P.id, P.user_id, P.created_at)
+            .join(friends, friends.c.author_id == P.user_id)
+        )
+    )
+    db.session.commit()
+
+
 if __name__ == '__main__':
-    seed_database()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Seed the GymHum database')
+    parser.add_argument('--bulk', action='store_true',
+                        help='generate a large synthetic dataset for load testing')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--friends-per-user', type=int, default=10)
+    parser.add_argument('--posts', type=int, default=50000)
+    parser.add_argument('--likes-per-post', type=int, default=5)
+    parser.add_argument('--sessions', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--anchor', type=datetime.fromisoformat, default=None,
+                        help='end of the generated time range (YYYY-MM-DD)')
+    parser.add_argument('--no-copy', action='store_true',
+                        help='use executemany even on PostgreSQL')
+    args = parser.parse_args()
+
+    if args.bulk:
+        seed_bulk(
+            num_users=args.users,
+            friends_per_user=args.friends_per_user,
+            num_posts=args.posts,
+            likes_per_post=args.likes_per_post,
+            num_sessions=args.sessions,
+            seed=args.seed,
+            chunk_size=args.chunk_size,
+            use_copy=False if args.no_copy else None,
+            anchor=args.anchor
+        )
+    else:
+        seed_database()
@@ -0,0 +1,39 @@
+from app import db
+from models.user import User
+from services.cache import named_cache
+
+CARD_FIELDS = ('id', 'username', 'avatar', 'bio')
+
+
+def load_author_cards(user_ids):
+    """Fetch the public "author card" for many users in one query.
+
+    Only the columns shown next to posts and plans are selected, so list
+    endpoints don't lazy-load a full User row per item. Cards are cached per
+    user (namespace 'author_cards', tag 'users'); only misses hit the database.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return {}
+
+    cache = named_cache('author_cards')
+    cards = cache.get_many(user_ids)
+    missing = user_ids.difference(cards)
+    if missing:
+        rows = db.session.execute(
+            db.select(*(getattr(User, field) for field in CARD_FIELDS))
+            .where(User.id.in_(missing))
+        ).all()
+        fetched = {row.id: dict(row._mapping) for row in rows}
+        cache.set_many(fetched, tags=('users',))
+        cards.update(fetched)
+    return cards
+
+
+def cards_for(items, fields=CARD_FIELDS, attr='user_id'):
+    """Map each item's author id to a card limited to `fields`"""
+    cards = load_author_cards(getattr(item, attr) for item in items)
+    return {
+        user_id: {field: card[field] for field in fields}
+        for user_id, card in cards.items()
+    }
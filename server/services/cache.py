@@ -0,0 +1,498 @@
+import hashlib
+import json
+import os
+import sqlite3
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from functools import wraps
+from threading import Lock
+
+MISSING = object()
+
+
+class CacheStats:
+    """Per-process hit/miss counters for one cache namespace"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'sets': self.sets,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
+
+
+class TTLCache:
+    """Small thread-safe in-process LRU cache with per-entry expiry and tags.
+
+    Entries expire `ttl` seconds after being set; once `maxsize` entries are
+    stored the least recently used one is evicted. Values are returned as
+    stored, so callers must treat them as read-only.
+    """
+
+    backend = 'memory'
+
+    def __init__(self, ttl, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stats = CacheStats()
+        self._data = OrderedDict()
+        self._tags = {}
+        self._lock = Lock()
+
+    def _drop(self, key):
+        _, _, tags = self._data.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _lookup(self, key, now):
+        entry = self._data.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return MISSING
+        if entry[0] < now:
+            self._drop(key)
+            self.stats.misses += 1
+            return MISSING
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return entry[1]
+
+    def _store(self, key, value, ttl, tags, now):
+        if key in self._data:
+            self._drop(key)
+        tags = frozenset(tags)
+        self._data[key] = (now + (self.ttl if ttl is None else ttl), value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        self.stats.sets += 1
+        while len(self._data) > self.maxsize:
+            self._drop(next(iter(self._data)))
+            self.stats.evictions += 1
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            value = self._lookup(key, time.monotonic())
+        return default if value is MISSING else value
+
+    def get_many(self, keys):
+        """Return {key: value} for the keys that are cached"""
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                value = self._lookup(key, now)
+                if value is not MISSING:
+                    found[key] = value
+        return found
+
+    def set(self, key, value, ttl=None, tags=()):
+        with self._lock:
+            self._store(key, value, ttl, tags, time.monotonic())
+
+    def set_many(self, mapping, ttl=None, tags=()):
+        now = time.monotonic()
+        with self._lock:
+            for key, value in mapping.items():
+                self._store(key, value, ttl, tags, now)
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+
+    def invalidate_tags(self, *tags):
+        """Drop every entry carrying any of `tags`; returns how many were dropped"""
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys.update(self._tags.get(tag, ()))
+            for key in keys:
+                self._drop(key)
+            self.stats.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class NullCache:
+    """Cache that stores nothing; used for namespaces configured with a TTL of 0"""
+
+    backend = 'null'
+    ttl = 0
+    maxsize = 0
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    def get(self, key, default=MISSING):
+        self.stats.misses += 1
+        return default
+
+    def get_many(self, keys):
+        self.stats.misses += len(keys)
+        return {}
+
+    def set(self, key, value, ttl=None, tags=()):
+        pass
+
+    def set_many(self, mapping, ttl=None, tags=()):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def invalidate_tags(self, *tags):
+        return 0
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+def _encode_value(o):
+    if isinstance(o, datetime):
+        return {'__datetime__': o.isoformat()}
+    if isinstance(o, date):
+        return {'__date__': o.isoformat()}
+    raise TypeError(f'{type(o).__name__} values cannot be stored in the shared cache')
+
+
+def _decode_value(o):
+    if '__datetime__' in o:
+        return datetime.fromisoformat(o['__datetime__'])
+    if '__date__' in o:
+        return date.fromisoformat(o['__date__'])
+    return o
+
+
+def _dumps(value):
+    return json.dumps(value, default=_encode_value, separators=(',', ':'))
+
+
+def _loads(text):
+    return json.loads(text, object_hook=_decode_value)
+
+
+def _check_private(path, st, kind):
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise RuntimeError(f'Refusing to use shared cache {kind} {path}: it must be owned by this user and not accessible to others')
+
+
+def _check_private_file(path):
+    """Create the cache file 0600 if missing, then insist it's ours and private"""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+    try:
+        st = os.fstat(fd)
+    finally:
+        os.close(fd)
+    if not stat.S_ISREG(st.st_mode):
+        raise RuntimeError(f'Refusing to use shared cache file {path}: not a regular file')
+    _check_private(path, st, 'file')
+
+
+_SHARED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS ix_cache_entries_expiry ON cache_entries (namespace, expires_at);
+CREATE TABLE IF NOT EXISTS cache_tags (
+    namespace TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (namespace, tag, key)
+);
+CREATE TRIGGER IF NOT EXISTS cache_entries_drop_tags AFTER DELETE ON cache_entries BEGIN
+    DELETE FROM cache_tags WHERE namespace = old.namespace AND key = old.key;
+END;
+"""
+
+
+class SharedCache:
+    """One namespace of a cache shared by every worker process on this host.
+
+    Entries live in a SQLite file (WAL mode, ideally on tmpfs) so a value
+    computed by one gunicorn worker is served by the others and a tag
+    invalidation from any worker is seen by all of them. Values are stored
+    as JSON (datetimes and dates round-trip, tuples come back as lists),
+    never pickled, and the file must be a private one owned by this user;
+    eviction drops the entries closest to expiry once `maxsize` is exceeded.
+    Stats are counted per process.
+    """
+
+    backend = 'shared'
+
+    def __init__(self, path, namespace, ttl, maxsize=1024):
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stats = CacheStats()
+        self._local = threading.local()
+
+    def _conn(self):
+        # Connections can't cross a fork, so gunicorn workers reconnect
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            _check_private_file(self.path)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SHARED_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key, default=MISSING):
+        return self.get_many([key]).get(key, default)
+
+    def get_many(self, keys):
+        keys = list(keys)
+        if not keys:
+            return {}
+        by_text = {repr(key): key for key in keys}
+        placeholders = ','.join('?' * len(by_text))
+        rows = self._conn().execute(
+            f'SELECT key, value FROM cache_entries '
+            f'WHERE namespace = ? AND expires_at >= ? AND key IN ({placeholders})',
+            (self.namespace, time.time(), *by_text)
+        ).fetchall()
+        found = {}
+        for text, value in rows:
+            try:
+                found[by_text[text]] = _loads(value)
+            except (TypeError, ValueError):
+                pass  # written by an older format; treat as a miss
+        self.stats.hits += len(found)
+        self.stats.misses += len(by_text) - len(found)
+        return found
+
+    def set(self, key, value, ttl=None, tags=()):
+        self.set_many({key: value}, ttl, tags)
+
+    def set_many(self, mapping, ttl=None, tags=()):
+        if not mapping:
+            return
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        entries = [(self.namespace, repr(key), _dumps(value), expires_at) for key, value in mapping.items()]
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany('INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?)', entries)
+            conn.executemany(
+                'INSERT OR IGNORE INTO cache_tags VALUES (?, ?, ?)',
+                [(self.namespace, tag, entry[1]) for entry in entries for tag in tags]
+            )
+            evicted = conn.execute(
+                'DELETE FROM cache_entries WHERE namespace = ? AND key IN ('
+                ' SELECT key FROM cache_entries WHERE namespace = ? ORDER BY expires_at'
+                ' LIMIT max(0, (SELECT count(*) FROM cache_entries WHERE namespace = ?) - ?))',
+                (self.namespace, self.namespace, self.namespace, self.maxsize)
+            ).rowcount
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        self.stats.sets += len(entries)
+        self.stats.evictions += evicted
+
+    def delete(self, key):
+        self._conn().execute(
+            'DELETE FROM cache_entries WHERE namespace = ? AND key = ?',
+            (self.namespace, repr(key))
+        )
+
+    def invalidate_tags(self, *tags):
+        if not tags:
+            return 0
+        placeholders = ','.join('?' * len(tags))
+        dropped = self._conn().execute(
+            f'DELETE FROM cache_entries WHERE namespace = ? AND key IN ('
+            f' SELECT key FROM cache_tags WHERE namespace = ? AND tag IN ({placeholders}))',
+            (self.namespace, self.namespace, *tags)
+        ).rowcount
+        self.stats.invalidations += dropped
+        return dropped
+
+    def clear(self):
+        self._conn().execute('DELETE FROM cache_entries WHERE namespace = ?', (self.namespace,))
+
+    def __len__(self):
+        return self._conn().execute(
+            'SELECT count(*) FROM cache_entries WHERE namespace = ? AND expires_at >= ?',
+            (self.namespace, time.time())
+        ).fetchone()[0]
+
+
+def runtime_dir(config):
+    """Private per-user, per-database directory for files shared by the workers.
+
+    Lives on /dev/shm when available and is created with mode 0700; an
+    existing directory owned by someone else, or open to others, is refused.
+    """
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    database = hashlib.sha1(str(config.get('SQLALCHEMY_DATABASE_URI')).encode()).hexdigest()[:12]
+    path = os.path.join(base, f'gymhum-{os.getuid()}-{database}')
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise RuntimeError(f'Refusing to use runtime directory {path}: not a directory')
+    _check_private(path, st, 'directory')
+    return path
+
+
+def default_shared_path(config):
+    return os.path.join(runtime_dir(config), 'cache.sqlite3')
+
+
+def _local_caches(app, remote):
+    # A shared cache already saw the write through its file; only this
+    # process's memory needs dropping when the message came from elsewhere
+    return [
+        cache for cache in list(app.extensions.get('caches', {}).values())
+        if not (remote and cache.backend == 'shared')
+    ]
+
+
+def init_app(app):
+    """Register the cache registry and apply invalidations published by other workers"""
+    from services import invalidation
+
+    app.extensions['caches'] = {}
+
+    def drop_tags(tags, remote):
+        for cache in _local_caches(app, remote):
+            cache.invalidate_tags(*tags)
+
+    def drop_keys(payload, remote):
+        cache = app.extensions['caches'].get(payload['namespace'])
+        if cache is not None and cache in _local_caches(app, remote):
+            for key in payload['keys']:
+                cache.delete(key)
+
+    def reset(_, remote):
+        for cache in _local_caches(app, remote):
+            cache.clear()
+
+    invalidation.subscribe(app, 'cache.tags', drop_tags)
+    invalidation.subscribe(app, 'cache.keys', drop_keys)
+    invalidation.subscribe(app, invalidation.RESET, reset)
+
+
+def _create(config, name, ttl, maxsize):
+    ttl = config.get('CACHE_TTLS', {}).get(name, ttl if ttl is not None else config.get('CACHE_DEFAULT_TTL', 60))
+    maxsize = maxsize or config.get('CACHE_MAXSIZE', 1024)
+    if not ttl:
+        return NullCache()
+    if config.get('CACHE_BACKEND') == 'shared':
+        return SharedCache(config.get('CACHE_SHARED_PATH') or default_shared_path(config), name, ttl, maxsize)
+    return TTLCache(ttl, maxsize)
+
+
+def named_cache(name, ttl=None, maxsize=None):
+    """Return the app-wide cache registered under `name`, creating it on first use.
+
+    CACHE_TTLS overrides the TTL per namespace; otherwise `ttl`, then
+    CACHE_DEFAULT_TTL applies. A TTL of 0 disables the namespace.
+    """
+    from flask import current_app
+
+    caches = current_app.extensions.setdefault('caches', {})
+    cache = caches.get(name)
+    if cache is None:
+        cache = caches.setdefault(name, _create(current_app.config, name, ttl, maxsize))
+    return cache
+
+
+def invalidate(*tags):
+    """Drop entries tagged with any of `tags` from every namespace, in every worker.
+
+    Call after the write commits. Returns how many entries this process dropped.
+    """
+    from flask import current_app
+    from services import invalidation
+
+    dropped = sum(cache.invalidate_tags(*tags) for cache in _local_caches(current_app, remote=False))
+    invalidation.publish('cache.tags', list(tags), local=False)
+    return dropped
+
+
+def invalidate_keys(namespace, *keys):
+    """Delete `keys` from one namespace in every worker; keys must survive a JSON round trip"""
+    from flask import current_app
+    from services import invalidation
+
+    cache = current_app.extensions.get('caches', {}).get(namespace)
+    if cache is not None:
+        for key in keys:
+            cache.delete(key)
+    invalidation.publish('cache.keys', {'namespace': namespace, 'keys': list(keys)}, local=False)
+
+
+def cache_stats():
+    """Per-namespace stats for this process"""
+    from flask import current_app
+
+    return {
+        name: {'backend': cache.backend, 'ttl': cache.ttl, 'maxsize': cache.maxsize, 'size': len(cache), **cache.stats.as_dict()}
+        for name, cache in current_app.extensions.get('caches', {}).items()
+    }
+
+
+def memoize(namespace, tags=(), ttl=None):
+    """Cache a function's return value per arguments in `namespace`.
+
+    `tags` is a sequence, or a callable receiving the call's arguments, so
+    writes can drop the entry with `invalidate(tag)`. Arguments must be
+    hashable and have a stable repr; pass a version or validator argument to
+    tie entries to the state of the data they were built from. The
+    undecorated function stays reachable as `.uncached`.
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = named_cache(namespace, ttl)
+            key = (name, args, tuple(sorted(kwargs.items())))
+            value = cache.get(key)
+            if value is MISSING:
+                value = func(*args, **kwargs)
+                cache.set(key, value, tags=tags(*args, **kwargs) if callable(tags) else tags)
+            return value
+        wrapper.uncached = func
+        return wrapper
+    return decorator
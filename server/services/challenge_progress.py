@@ -0,0 +1,86 @@
+from sqlalchemy import bindparam
+from app import db
+from models.challenge import Challenge, UserChallenge
+
+MAX_BATCH_SIZE = 500
+
+
+def _parse(item):
+    if not isinstance(item, dict):
+        return None, None
+    challenge_id, progress = item.get('challenge_id'), item.get('progress')
+    if (not isinstance(challenge_id, int) or isinstance(challenge_id, bool) or
+            not isinstance(progress, int) or isinstance(progress, bool) or
+            progress < 0):
+        return None, None
+    return challenge_id, progress
+
+
+def apply_progress_batch(user_id, items):
+    """Apply many (challenge_id, progress) updates for one user in one transaction.
+
+    One SELECT finds which challenges the user has joined, then a single
+    executemany UPDATE writes progress and derives `completed` in SQL.
+    Returns one result dict per input item, in order. The caller commits.
+    """
+    parsed = [_parse(item) for item in items]
+    requested = {cid for cid, _ in parsed if cid is not None}
+
+    joined = {
+        row.challenge_id: row
+        for row in db.session.execute(
+            db.select(UserChallenge.challenge_id, UserChallenge.completed, Challenge.target)
+            .join(Challenge, Challenge.id == UserChallenge.challenge_id)
+            .where(
+                UserChallenge.user_id == user_id,
+                UserChallenge.challenge_id.in_(requested)
+            )
+        )
+    } if requested else {}
+
+    # Later items for the same challenge win
+    latest = {}
+    for cid, progress in parsed:
+        if cid in joined:
+            latest[cid] = progress
+
+    if latest:
+        table = UserChallenge.__table__
+        target = db.select(Challenge.target).where(
+            Challenge.id == table.c.challenge_id
+        ).scalar_subquery()
+        db.session.execute(
+            table.update()
+            .where(
+                table.c.user_id == bindparam('b_user_id'),
+                table.c.challenge_id == bindparam('b_challenge_id')
+            )
+            .values(
+                progress=bindparam('b_progress'),
+                completed=db.or_(
+                    db.func.coalesce(table.c.completed, False),
+                    bindparam('b_progress') >= target
+                )
+            ),
+            [{
+                'b_user_id': user_id,
+                'b_challenge_id': cid,
+                'b_progress': progress
+            } for cid, progress in latest.items()]
+        )
+
+    results = []
+    for item, (cid, progress) in zip(items, parsed):
+        if cid is None:
+            results.append({'item': item, 'status': 'invalid'})
+        elif cid not in joined:
+            results.append({'challenge_id': cid, 'status': 'not_found'})
+        else:
+            row = joined[cid]
+            results.append({
+                'challenge_id': cid,
+                'status': 'updated',
+                'progress': latest[cid],
+                'completed': bool(row.completed) or latest[cid] >= row.target
+            })
+    return results
@@ -0,0 +1,97 @@
+from app import db
+from models.exercise import Exercise, workout_exercises, exercise_slug, parse_exercises
+from models.workout import Workout
+from utils.sql import insert_ignore
+
+
+def resolve_exercises(names, create=True):
+    """Map exercise names to catalog ids, keyed by slug (optionally adding new ones)"""
+    by_slug = {}
+    for name in names:
+        by_slug.setdefault(exercise_slug(name), name.strip())
+    by_slug.pop('', None)
+    if not by_slug:
+        return {}
+
+    if create:
+        db.session.execute(
+            insert_ignore(Exercise.__table__),
+            [{'name': name, 'slug': slug} for slug, name in by_slug.items()]
+        )
+
+    return dict(db.session.execute(
+        db.select(Exercise.slug, Exercise.id).where(Exercise.slug.in_(by_slug))
+    ).all())
+
+
+def _link_rows(workout_id, names, ids):
+    rows, seen = [], set()
+    for position, name in enumerate(names):
+        exercise_id = ids.get(exercise_slug(name))
+        if exercise_id and exercise_id not in seen:
+            seen.add(exercise_id)
+            rows.append({
+                'workout_id': workout_id,
+                'exercise_id': exercise_id,
+                'position': position
+            })
+    return rows
+
+
+def _relink(workouts):
+    """Replace catalog links for (workout_id, exercises_text) pairs"""
+    parsed = [(workout_id, parse_exercises(text)) for workout_id, text in workouts]
+    ids = resolve_exercises(name for _, names in parsed for name in names)
+
+    db.session.execute(
+        workout_exercises.delete().where(
+            workout_exercises.c.workout_id.in_([workout_id for workout_id, _ in parsed])
+        )
+    )
+    rows = [row for workout_id, names in parsed for row in _link_rows(workout_id, names, ids)]
+    if rows:
+        db.session.execute(workout_exercises.insert(), rows)
+
+
+def sync_workout_exercises(workout):
+    """Rebuild a flushed workout's catalog links from its text column; the caller commits"""
+    _relink([(workout.id, workout.exercises)])
+
+
+def backfill(batch_size=1000):
+    """Parse every workout's exercises text into the catalog; returns workouts processed"""
+    processed = 0
+    last_id = 0
+    while True:
+        batch = db.session.execute(
+            db.select(Workout.id, Workout.exercises)
+            .where(Workout.id > last_id)
+            .order_by(Workout.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            break
+
+        _relink([(row.id, row.exercises) for row in batch])
+        db.session.commit()
+
+        processed += len(batch)
+        last_id = batch[-1].id
+    return processed
+
+
+def filter_by_exercises(query, names, match='any'):
+    """Restrict a Workout query to workouts including any/all of `names`"""
+    slugs = {exercise_slug(n) for n in names} - {''}
+    if not slugs:
+        return query
+
+    exercise_ids = db.select(Exercise.id).where(Exercise.slug.in_(slugs))
+    matching = db.select(workout_exercises.c.workout_id).where(
+        workout_exercises.c.exercise_id.in_(exercise_ids)
+    )
+    if match == 'all':
+        matching = matching.group_by(workout_exercises.c.workout_id).having(
+            db.func.count(workout_exercises.c.exercise_id) == len(slugs)
+        )
+    return query.filter(Workout.id.in_(matching))
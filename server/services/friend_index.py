@@ -0,0 +1,176 @@
+import time
+from collections import OrderedDict
+from threading import RLock
+from flask import current_app
+from app import db
+from services import invalidation
+
+
+class _Adjacency:
+    """Neighbour sets for one user"""
+    __slots__ = ('accepted', 'incoming', 'outgoing', 'loaded_at')
+
+    def __init__(self):
+        self.accepted = set()   # accepted friends (either direction)
+        self.incoming = set()   # pending requests sent to this user
+        self.outgoing = set()   # pending requests sent by this user
+        self.loaded_at = time.monotonic()
+
+
+class FriendIndex:
+    """Process-local adjacency index over user_friends.
+
+    Each user's neighbours are loaded with a single query the first time
+    they are needed and then kept up to date by the friendship write paths,
+    so friendship checks and friend id lists don't hit the database. Other
+    workers learn about those writes over the invalidation bus and reload
+    the affected users; without a bus, entries are reloaded once they are
+    FRIEND_INDEX_TTL seconds old, so a worker is never stale for longer.
+    At most FRIEND_INDEX_MAX_USERS users are kept; the least recently used
+    is evicted first.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['friend_index'] = {'users': OrderedDict(), 'lock': RLock()}
+
+        def drop_users(user_ids, remote):
+            with app.extensions['friend_index']['lock']:
+                for user_id in user_ids:
+                    app.extensions['friend_index']['users'].pop(user_id, None)
+
+        def reset(_, remote):
+            with app.extensions['friend_index']['lock']:
+                app.extensions['friend_index']['users'].clear()
+
+        invalidation.subscribe(app, 'friend_index', drop_users)
+        invalidation.subscribe(app, invalidation.RESET, reset)
+
+    @property
+    def _state(self):
+        return current_app.extensions['friend_index']
+
+    def _load(self, user_id):
+        # models.user imports this module, so resolve the table lazily
+        from models.user import user_friends
+
+        rows = db.session.execute(
+            db.select(
+                user_friends.c.user_id,
+                user_friends.c.friend_id,
+                user_friends.c.status
+            ).where(
+                (user_friends.c.user_id == user_id) |
+                (user_friends.c.friend_id == user_id)
+            )
+        ).all()
+
+        adj = _Adjacency()
+        for src, dst, status in rows:
+            other = dst if src == user_id else src
+            if status == 'accepted':
+                adj.accepted.add(other)
+            elif status == 'pending':
+                (adj.outgoing if src == user_id else adj.incoming).add(other)
+        return adj
+
+    def _get(self, user_id):
+        user_id = int(user_id)
+        state = self._state
+        ttl = current_app.config.get('FRIEND_INDEX_TTL', 60)
+        with state['lock']:
+            adj = state['users'].get(user_id)
+            if adj is not None and ttl and time.monotonic() - adj.loaded_at > ttl:
+                del state['users'][user_id]
+                adj = None
+            if adj is not None:
+                state['users'].move_to_end(user_id)
+        if adj is None:
+            adj = self._load(user_id)
+            maxsize = current_app.config.get('FRIEND_INDEX_MAX_USERS', 100000)
+            with state['lock']:
+                adj = state['users'].setdefault(user_id, adj)
+                while len(state['users']) > maxsize:
+                    state['users'].popitem(last=False)
+        return adj
+
+    def _loaded(self, user_id):
+        return self._state['users'].get(int(user_id))
+
+    def _publish(self, *user_ids):
+        # This worker was updated in place; the others reload both users
+        invalidation.publish('friend_index', list(user_ids), local=False)
+
+    # Reads
+    def friend_ids(self, user_id):
+        return sorted(self._get(user_id).accepted)
+
+    def pending_request_ids(self, user_id):
+        return sorted(self._get(user_id).incoming)
+
+    def is_related(self, user_id, other_id):
+        """True if any friendship row (pending or accepted) links the two users"""
+        adj = self._get(user_id)
+        other_id = int(other_id)
+        return (other_id in adj.accepted or
+                other_id in adj.incoming or
+                other_id in adj.outgoing)
+
+    # Incremental updates, called after the corresponding commit
+    def request_sent(self, user_id, friend_id):
+        user_id, friend_id = int(user_id), int(friend_id)
+        with self._state['lock']:
+            sender = self._loaded(user_id)
+            if sender:
+                sender.outgoing.add(friend_id)
+            receiver = self._loaded(friend_id)
+            if receiver:
+                receiver.incoming.add(user_id)
+        self._publish(user_id, friend_id)
+
+    def request_accepted(self, user_id, friend_id):
+        user_id, friend_id = int(user_id), int(friend_id)
+        with self._state['lock']:
+            for a, b in ((user_id, friend_id), (friend_id, user_id)):
+                adj = self._loaded(a)
+                if adj:
+                    adj.incoming.discard(b)
+                    adj.outgoing.discard(b)
+                    adj.accepted.add(b)
+        self._publish(user_id, friend_id)
+
+    def request_rejected(self, sender_id, receiver_id):
+        sender_id, receiver_id = int(sender_id), int(receiver_id)
+        with self._state['lock']:
+            sender = self._loaded(sender_id)
+            if sender:
+                sender.outgoing.discard(receiver_id)
+            receiver = self._loaded(receiver_id)
+            if receiver:
+                receiver.incoming.discard(sender_id)
+        self._publish(sender_id, receiver_id)
+
+    def friendship_removed(self, user_id, friend_id):
+        user_id, friend_id = int(user_id), int(friend_id)
+        with self._state['lock']:
+            for a, b in ((user_id, friend_id), (friend_id, user_id)):
+                adj = self._loaded(a)
+                if adj:
+                    adj.accepted.discard(b)
+                    adj.incoming.discard(b)
+                    adj.outgoing.discard(b)
+        self._publish(user_id, friend_id)
+
+    def invalidate(self, user_id=None):
+        """Drop one user's entry (or everything) so it is reloaded on next use"""
+        with self._state['lock']:
+            if user_id is None:
+                self._state['users'].clear()
+            else:
+                self._state['users'].pop(int(user_id), None)
+
+
+friend_index = FriendIndex()
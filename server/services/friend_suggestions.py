@@ -0,0 +1,99 @@
+from app import db
+from models.user import User, user_friends
+from sqlalchemy import func, union, union_all, select
+
+# Friendships can be stored as one or two rows depending on how they were
+# created (seed data vs. accept_friend_request), so every hop reads both
+# directions. Each arm filters on an indexed column (the primary key's
+# user_id prefix or ix_user_friends_friend_id_status), so a request only
+# touches the rows around the caller instead of the whole table.
+def _friend_ids(user_id):
+    """Accepted friends of one user (may repeat when both directions are stored)"""
+    return union_all(
+        select(user_friends.c.friend_id.label('id')).where(
+            user_friends.c.user_id == user_id,
+            user_friends.c.status == 'accepted'
+        ),
+        select(user_friends.c.user_id.label('id')).where(
+            user_friends.c.friend_id == user_id,
+            user_friends.c.status == 'accepted'
+        )
+    ).cte('friends')
+
+
+def _friends_of(friends):
+    """(candidate, via) pairs: accepted friends of each id in `friends`"""
+    return union_all(
+        select(
+            user_friends.c.friend_id.label('candidate'),
+            user_friends.c.user_id.label('via')
+        ).where(
+            user_friends.c.user_id.in_(select(friends.c.id)),
+            user_friends.c.status == 'accepted'
+        ),
+        select(
+            user_friends.c.user_id.label('candidate'),
+            user_friends.c.friend_id.label('via')
+        ).where(
+            user_friends.c.friend_id.in_(select(friends.c.id)),
+            user_friends.c.status == 'accepted'
+        )
+    ).subquery('friends_of_friends')
+
+
+def _related_ids(user_id):
+    """Ids the user already has any relationship with (accepted or pending)"""
+    return union(
+        select(user_friends.c.friend_id).where(user_friends.c.user_id == user_id),
+        select(user_friends.c.user_id).where(user_friends.c.friend_id == user_id)
+    )
+
+
+def suggest_friends(user_id, limit=10):
+    """Rank non-friends by mutual friend count.
+
+    Runs one aggregate query over the caller's friends and their friends
+    and, when there are fewer than `limit` friend-of-friend candidates, one
+    more query to backfill with other users.
+    """
+    fof = _friends_of(_friend_ids(user_id))
+    related = _related_ids(user_id)
+
+    mutual = func.count(func.distinct(fof.c.via)).label('mutual')
+    ranked = db.session.execute(
+        select(User.id, User.username, User.avatar, mutual)
+        .select_from(fof)
+        .join(User, User.id == fof.c.candidate)
+        .where(
+            fof.c.candidate != user_id,
+            fof.c.candidate.not_in(related)
+        )
+        .group_by(User.id, User.username, User.avatar)
+        .order_by(mutual.desc(), User.id)
+        .limit(limit)
+    ).all()
+
+    suggestions = [{
+        'id': row.id,
+        'username': row.username,
+        'avatar': row.avatar,
+        'mutualFriends': row.mutual
+    } for row in ranked]
+
+    remaining = limit - len(suggestions)
+    if remaining > 0:
+        exclude = [row.id for row in ranked] + [user_id]
+        others = db.session.execute(
+            select(User.id, User.username, User.avatar)
+            .where(User.id.not_in(exclude), User.id.not_in(related))
+            .order_by(User.id)
+            .limit(remaining)
+        ).all()
+        suggestions.extend({
+            'id': row.id,
+            'username': row.username,
+            'avatar': row.avatar,
+            'mutualFriends': 0
+        } for row in others)
+
+    return suggestions
@@ -0,0 +1,311 @@
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+from collections import defaultdict, deque
+from threading import Lock
+
+from flask import current_app
+
+logger = logging.getLogger('gymhum.invalidation')
+
+# Delivered to subscribers when a transport may have dropped messages
+# (e.g. a lost LISTEN connection); they should forget everything.
+RESET = '*reset'
+
+
+class InvalidationBus:
+    """Fan-out of cache/index invalidations from the writing worker to all others.
+
+    `publish` applies a message to this worker's subscribers straight away
+    and hands it to the transport; other workers pick it up in `poll`, which
+    runs before each request, so a worker never serves a request with
+    invalidations it could have seen. Handlers are called as
+    handler(payload, remote) and payloads must be JSON-serializable.
+    """
+
+    def __init__(self, transport=None):
+        self.transport = transport
+        self._handlers = defaultdict(list)
+        self._origin = None
+        self._pid = None
+
+    @property
+    def origin(self):
+        # Regenerated after a fork so preloaded gunicorn workers don't share it
+        if self._pid != os.getpid():
+            self._origin = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+            self._pid = os.getpid()
+        return self._origin
+
+    def subscribe(self, channel, handler):
+        self._handlers[channel].append(handler)
+
+    def _dispatch(self, channel, payload, remote):
+        for handler in self._handlers.get(channel, ()):
+            handler(payload, remote)
+
+    def publish(self, channel, payload, local=True):
+        if local:
+            self._dispatch(channel, payload, remote=False)
+        if self.transport is None:
+            return
+        try:
+            self.transport.send({'origin': self.origin, 'channel': channel, 'payload': payload})
+        except Exception:
+            # Best effort: other workers fall back to cache TTLs
+            logger.exception('Failed to publish %s invalidation', channel)
+
+    def poll(self):
+        if self.transport is None:
+            return
+        try:
+            messages = self.transport.receive()
+        except Exception:
+            logger.exception('Failed to receive invalidations')
+            return
+        for message in messages:
+            if message == RESET:
+                self._dispatch(RESET, None, remote=True)
+            elif message['origin'] != self.origin:
+                self._dispatch(message['channel'], message['payload'], remote=True)
+
+
+class MemoryTransport:
+    """Delivers to every other transport on the same in-process hub (tests, multiple apps)"""
+
+    _hubs = defaultdict(list)
+
+    def __init__(self, hub='default'):
+        self._queue = deque()
+        self._peers = MemoryTransport._hubs[hub]
+        self._peers.append(self)
+
+    def send(self, message):
+        for peer in list(self._peers):
+            if peer is not self:
+                peer._queue.append(message)
+
+    def receive(self):
+        messages = []
+        while self._queue:
+            messages.append(self._queue.popleft())
+        return messages
+
+
+class SequenceLogTransport:
+    """Append-only JSON-lines log shared by the workers on one host.
+
+    Writers append whole lines under an exclusive flock; each worker keeps
+    its own read offset and reads what's new on every poll, which costs one
+    stat() when nothing changed. Keep the file on tmpfs (/dev/shm) so it is
+    effectively a shared-memory ring. Once it exceeds `max_bytes` a writer
+    atomically replaces it with a new file whose first line is the next
+    generation number; readers finish the old file through their open handle
+    and get RESET if they slept through more than one rotation.
+    """
+
+    def __init__(self, path, max_bytes=4 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._reader = None
+        self._inode = None
+        self._generation = None
+        self._pid = None
+        self._buffer = b''
+        self._lock = Lock()
+
+    @staticmethod
+    def _header_generation(fd):
+        first = os.pread(fd, 64, 0).split(b'\n', 1)[0]
+        if first.startswith(b'{"generation":'):
+            return json.loads(first)['generation']
+        return 0
+
+    def _rotate(self, fd):
+        generation = self._header_generation(fd) + 1
+        directory, name = os.path.split(os.path.abspath(self.path))
+        tmp_fd, tmp_path = tempfile.mkstemp(prefix=name, dir=directory)
+        try:
+            os.write(tmp_fd, json.dumps({'generation': generation}).encode() + b'\n')
+        finally:
+            os.close(tmp_fd)
+        os.replace(tmp_path, self.path)
+
+    def send(self, message):
+        import fcntl
+
+        line = json.dumps(message, separators=(',', ':')).encode() + b'\n'
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                try:
+                    current = os.stat(self.path).st_ino
+                except FileNotFoundError:
+                    current = None
+                if current != os.fstat(fd).st_ino:
+                    continue  # rotated while we waited for the lock
+                if os.fstat(fd).st_size + len(line) > self.max_bytes:
+                    self._rotate(fd)
+                    continue
+                os.write(fd, line)
+                return
+            finally:
+                os.close(fd)
+
+    def _open(self, at_end):
+        os.close(os.open(self.path, os.O_WRONLY | os.O_CREAT, 0o600))
+        self._reader = open(self.path, 'rb')
+        fd = self._reader.fileno()
+        self._inode = os.fstat(fd).st_ino
+        self._buffer = b''
+        previous, self._generation = self._generation, self._header_generation(fd)
+        if at_end:
+            self._reader.seek(0, os.SEEK_END)
+        return previous
+
+    def _drain(self):
+        data = self._reader.read()
+        if not data:
+            return []
+        self._buffer += data
+        *lines, self._buffer = self._buffer.split(b'\n')
+        messages = (json.loads(line) for line in lines if line)
+        return [m for m in messages if 'generation' not in m]
+
+    def receive(self):
+        with self._lock:
+            if self._reader is None or self._pid != os.getpid():
+                # New workers start at the end; there is nothing cached to invalidate yet
+                if self._reader is not None:
+                    self._reader.close()
+                self._generation = None
+                self._open(at_end=True)
+                self._pid = os.getpid()
+                return []
+
+            messages = self._drain()
+            try:
+                rotated = os.stat(self.path).st_ino != self._inode
+            except FileNotFoundError:
+                rotated = True
+            if rotated:
+                messages += self._drain()
+                self._reader.close()
+                previous = self._open(at_end=False)
+                if self._generation != previous + 1:
+                    # Whole generations were replaced unseen
+                    messages = [RESET]
+                messages += self._drain()
+            return messages
+
+
+class PostgresTransport:
+    """LISTEN/NOTIFY on a dedicated autocommit connection per worker.
+
+    NOTIFY is sent on the same connection rather than the request's
+    session, whose transaction is rolled back at teardown. After the
+    connection drops, the next successful reconnect yields RESET because
+    notifications sent in between are gone; reconnects are attempted at
+    most every RETRY_SECONDS so an outage doesn't slow every request.
+    """
+
+    CHANNEL = 'gymhum_invalidation'
+    RETRY_SECONDS = 5
+
+    def __init__(self, dsn):
+        self.dsn = dsn
+        self._conn = None
+        self._pid = None
+        self._missed = False
+        self._retry_at = 0
+        self._lock = Lock()
+
+    def _connection(self):
+        if self._conn is None or self._conn.closed or self._pid != os.getpid():
+            import psycopg2
+            from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+            reconnect = self._pid == os.getpid()
+            conn = psycopg2.connect(self.dsn)
+            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN {self.CHANNEL}')
+            self._conn, self._pid = conn, os.getpid()
+            self._missed = self._missed or reconnect
+        return self._conn
+
+    def _reset_connection(self):
+        if self._conn is not None and not self._conn.closed:
+            self._conn.close()
+        self._conn = None
+        self._missed = True
+        self._retry_at = time.monotonic() + self.RETRY_SECONDS
+
+    def send(self, message):
+        with self._lock:
+            if time.monotonic() < self._retry_at:
+                raise ConnectionError('invalidation listener is reconnecting')
+            try:
+                with self._connection().cursor() as cursor:
+                    cursor.execute('SELECT pg_notify(%s, %s)', (self.CHANNEL, json.dumps(message)))
+            except Exception:
+                self._reset_connection()
+                raise
+
+    def receive(self):
+        with self._lock:
+            if time.monotonic() < self._retry_at:
+                return []
+            try:
+                conn = self._connection()
+                conn.poll()
+            except Exception:
+                self._reset_connection()
+                raise
+            messages = [RESET] if self._missed else []
+            self._missed = False
+            while conn.notifies:
+                messages.append(json.loads(conn.notifies.pop(0).payload))
+            return messages
+
+
+def _transport(app):
+    kind = app.config.get('INVALIDATION_TRANSPORT', 'none')
+    if kind in (None, '', 'none'):
+        return None
+    if kind == 'memory':
+        return MemoryTransport()
+    if kind == 'log':
+        from services.cache import runtime_dir
+
+        path = app.config.get('INVALIDATION_LOG_PATH') or os.path.join(runtime_dir(app.config), 'invalidation.log')
+        return SequenceLogTransport(path)
+    if kind == 'postgres':
+        from app import db
+
+        with app.app_context():
+            url = db.engine.url
+        if url.get_backend_name() != 'postgresql':
+            raise ValueError('INVALIDATION_TRANSPORT=postgres needs a PostgreSQL database')
+        return PostgresTransport(url.set(drivername='postgresql').render_as_string(hide_password=False))
+    raise ValueError(f'Unknown INVALIDATION_TRANSPORT: {kind}')
+
+
+def init_app(app):
+    bus = InvalidationBus(_transport(app))
+    app.extensions['invalidation_bus'] = bus
+    if bus.transport is not None:
+        app.before_request(bus.poll)
+
+
+def subscribe(app, channel, handler):
+    app.extensions['invalidation_bus'].subscribe(channel, handler)
+
+
+def publish(channel, payload, local=True):
+    """Apply an invalidation here (unless local=False) and in every other worker"""
+    current_app.extensions['invalidation_bus'].publish(channel, payload, local)
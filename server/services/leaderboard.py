@@ -0,0 +1,76 @@
+from app import db
+from models.challenge import UserChallenge
+from services.author_cards import cards_for
+
+# Leaderboard position is by (progress DESC, id ASC): ties go to whoever
+# joined first. Every query below is a range scan on
+# ix_user_challenges_leaderboard (challenge_id, progress DESC, id), so
+# nothing sorts the full participant list.
+
+
+def _ahead_of(row):
+    return (UserChallenge.progress > row.progress) | (
+        (UserChallenge.progress == row.progress) & (UserChallenge.id < row.id)
+    )
+
+
+def _behind(row):
+    return (UserChallenge.progress < row.progress) | (
+        (UserChallenge.progress == row.progress) & (UserChallenge.id > row.id)
+    )
+
+
+def _entries(rows, first_rank, target, authors):
+    return [{
+        'rank': first_rank + i,
+        'user': authors.get(uc.user_id),
+        'progress': uc.progress,
+        'completed': uc.progress >= target
+    } for i, uc in enumerate(rows)]
+
+
+def build_leaderboard(challenge, user_id=None, limit=10, around=2):
+    """Top `limit` participants plus the caller's rank and `around` neighbours each side"""
+    base = UserChallenge.query.filter(UserChallenge.challenge_id == challenge.id)
+
+    top = base.order_by(UserChallenge.progress.desc(), UserChallenge.id).limit(limit).all()
+    participants = db.session.query(db.func.count(UserChallenge.id)).filter(
+        UserChallenge.challenge_id == challenge.id
+    ).scalar()
+
+    me = None
+    above, below = [], []
+    if user_id is not None:
+        me = base.filter(UserChallenge.user_id == user_id).first()
+
+    if me is not None:
+        rank = 1 + db.session.query(db.func.count(UserChallenge.id)).filter(
+            UserChallenge.challenge_id == challenge.id, _ahead_of(me)
+        ).scalar()
+        if around:
+            above = base.filter(_ahead_of(me)).order_by(
+                UserChallenge.progress.asc(), UserChallenge.id.desc()
+            ).limit(around).all()[::-1]
+            below = base.filter(_behind(me)).order_by(
+                UserChallenge.progress.desc(), UserChallenge.id
+            ).limit(around).all()
+
+    authors = cards_for(top + above + ([me] if me else []) + below,
+                        fields=('id', 'username', 'avatar'))
+
+    result = {
+        'challenge': {
+            'id': challenge.id,
+            'name': challenge.name,
+            'target': challenge.target
+        },
+        'participants': participants,
+        'top': _entries(top, 1, challenge.target, authors),
+        'me': None,
+        'nearby': []
+    }
+    if me is not None:
+        result['me'] = _entries([me], rank, challenge.target, authors)[0]
+        result['nearby'] = _entries(above + [me] + below, rank - len(above),
+                                    challenge.target, authors)
+    return result
@@ -0,0 +1,142 @@
+import re
+from sqlalchemy import event, or_
+from app import db
+from models.post import Post
+from models.user import User
+
+# Full-text search over post content and author usernames.
+#
+# PostgreSQL: generated tsvector columns on posts/users with GIN indexes.
+# SQLite:     an FTS5 table (posts_fts) kept in sync by triggers.
+# Both are maintained by the database itself on post insert/update/delete,
+# so every write path (API, seed scripts, shell) keeps the index current.
+
+_POSTGRES_DDL = [
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(username, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_users_search_vector ON users USING GIN (search_vector)",
+    "ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_posts_search_vector ON posts USING GIN (search_vector)",
+]
+
+_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+    "content, username, tokenize = 'porter unicode61')",
+    """CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts (rowid, content, username)
+        VALUES (new.id, new.content, (SELECT username FROM users WHERE id = new.user_id));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF content ON posts BEGIN
+        UPDATE posts_fts SET content = new.content WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+        DELETE FROM posts_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS posts_fts_username AFTER UPDATE OF username ON users BEGIN
+        UPDATE posts_fts SET username = new.username
+        WHERE rowid IN (SELECT id FROM posts WHERE user_id = new.id);
+    END""",
+]
+
+
+def create_search_index(connection, rebuild=False):
+    """Create the dialect-specific index objects (idempotent)"""
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        statements = _POSTGRES_DDL
+    elif dialect == 'sqlite':
+        statements = list(_SQLITE_DDL)
+        if rebuild:
+            statements += [
+                "DELETE FROM posts_fts",
+                "INSERT INTO posts_fts (rowid, content, username) "
+                "SELECT posts.id, posts.content, users.username "
+                "FROM posts JOIN users ON users.id = posts.user_id",
+            ]
+    else:
+        return False
+
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+    return True
+
+
+# Created by the DDL above rather than declared on the models
+_UNMANAGED = re.compile(r'^(posts_fts(_\w+)?|search_vector|ix_\w+_search_vector)$')
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Alembic autogenerate filter so `flask db migrate` doesn't drop the search index"""
+    return not (reflected and compare_to is None and name and _UNMANAGED.match(name))
+
+
+@event.listens_for(Post.__table__, 'after_create')
+def _after_posts_create(target, connection, **kw):
+    create_search_index(connection)
+
+
+@event.listens_for(Post.__table__, 'before_drop')
+def _before_posts_drop(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql("DROP TABLE IF EXISTS posts_fts")
+
+
+def _terms(search):
+    return re.findall(r'\w+', search.lower())
+
+
+def _like_search(query, search):
+    return query.join(User).filter(
+        or_(
+            Post.content.ilike(f'%{search}%'),
+            User.username.ilike(f'%{search}%')
+        )
+    ), []
+
+
+def apply_search(query, search):
+    """Filter a Post query by `search`.
+
+    Returns (query, relevance) where `relevance` is a list of ORDER BY
+    clauses (best match first). Every term must match, and the last term is
+    treated as a prefix so results update while the user is typing.
+    """
+    terms = _terms(search)
+    dialect = db.session.get_bind().dialect.name
+    if not terms or dialect not in ('postgresql', 'sqlite'):
+        return _like_search(query, search)
+
+    if dialect == 'postgresql':
+        tsquery = ' & '.join(terms[:-1] + [terms[-1] + ':*'])
+        post_vector = db.literal_column('posts.search_vector')
+        user_vector = db.literal_column('users.search_vector')
+        content_q = db.func.to_tsquery('english', tsquery)
+        username_q = db.func.to_tsquery('simple', tsquery)
+
+        matches = db.union_all(
+            db.select(
+                Post.id.label('post_id'),
+                db.func.ts_rank(post_vector, content_q).label('score')
+            ).where(post_vector.op('@@')(content_q)),
+            db.select(
+                Post.id.label('post_id'),
+                db.func.ts_rank(user_vector, username_q).label('score')
+            ).join(User, User.id == Post.user_id).where(user_vector.op('@@')(username_q))
+        ).subquery()
+        ranked = db.select(
+            matches.c.post_id,
+            db.func.sum(matches.c.score).label('score')
+        ).group_by(matches.c.post_id).subquery()
+        return query.join(ranked, ranked.c.post_id == Post.id), [ranked.c.score.desc()]
+
+    # SQLite FTS5: quote each term so user input can't inject query syntax
+    fts_query = ' '.join('"%s"' % t for t in terms[:-1]) + ' "%s"*' % terms[-1]
+    ranked = db.select(
+        db.literal_column('rowid').label('post_id'),
+        db.literal_column('bm25(posts_fts)').label('score')
+    ).select_from(db.text('posts_fts')).where(
+        db.text('posts_fts MATCH :fts_query').bindparams(fts_query=fts_query.strip())
+    ).subquery()
+    # bm25() is lower-is-better
+    return query.join(ranked, ranked.c.post_id == Post.id), [ranked.c.score.asc()]
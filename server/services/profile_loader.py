@@ -0,0 +1,114 @@
+from flask import current_app
+from app import db
+from models.user import User, saved_recipes_table
+from models.workout import Workout
+from models.workout_session import WorkoutSession
+from models.post import Post
+from models.challenge import Challenge, UserChallenge
+from models.nutrition import NutritionPlan
+from services.cache import named_cache, invalidate_keys, MISSING
+from services.user_serializer import serialize_users
+
+
+def _cache():
+    return named_cache('profiles', current_app.config.get('PROFILE_CACHE_TTL', 0))
+
+
+def invalidate_profile(*user_ids):
+    """Drop cached profile snapshots in every worker; call after a write that shows up on a profile"""
+    invalidate_keys('profiles', *(int(user_id) for user_id in user_ids))
+
+
+def load_profile(user_id):
+    """Build the /api/profile payload with one grouped query per section.
+
+    Returns None if the user doesn't exist. Cached snapshots are served
+    without touching the database.
+    """
+    user_id = int(user_id)
+    cache = _cache()
+    snapshot = cache.get(user_id)
+    if snapshot is not MISSING:
+        return snapshot
+
+    user = User.query.get(user_id)
+    if not user:
+        return None
+
+    # Workouts the user has actually logged, with their latest session
+    workouts = db.session.execute(
+        db.select(
+            Workout.id,
+            Workout.name,
+            db.func.max(WorkoutSession.started_at).label('last_done')
+        )
+        .join(WorkoutSession, WorkoutSession.workout_id == Workout.id)
+        .where(WorkoutSession.user_id == user.id)
+        .group_by(Workout.id, Workout.name)
+        .order_by(Workout.id)
+    ).all()
+
+    saved_recipes = db.session.execute(
+        db.select(NutritionPlan.id, NutritionPlan.name, NutritionPlan.created_at)
+        .join(saved_recipes_table,
+              saved_recipes_table.c.nutrition_id == NutritionPlan.id)
+        .where(saved_recipes_table.c.user_id == user.id)
+    ).all()
+
+    challenges = db.session.execute(
+        db.select(Challenge.name, UserChallenge.joined_at)
+        .join(Challenge, UserChallenge.challenge_id == Challenge.id)
+        .where(UserChallenge.user_id == user.id)
+        .order_by(UserChallenge.id)
+    ).all()
+
+    posts = db.session.execute(
+        db.select(Post.id, Post.content, Post.created_at)
+        .where(Post.user_id == user.id)
+        .order_by(Post.created_at.desc())
+        .limit(5)
+    ).all()
+
+    profile_data = {
+        # Basic user info
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "avatar": user.avatar,
+        "bio": user.bio,
+        "created_at": user.created_at,
+
+        # Activity data
+        "completedWorkouts": [w.id for w in workouts],
+        "savedRecipes": [
+            {
+                "id": r.id,
+                "name": r.name,
+                "date": r.created_at
+            } for r in saved_recipes
+        ],
+        "communityChallenges": [
+            {
+                "name": uc.name,
+                "joined_at": uc.joined_at
+            } for uc in challenges
+        ],
+        "friends": serialize_users(user.get_friends()),
+        "completedWorkoutDetails": [
+            {
+                "id": w.id,
+                "name": w.name,
+                "date": w.last_done
+            } for w in workouts
+        ],
+        "posts": [
+            {
+                "id": p.id,
+                "content": p.content,
+                "time": p.created_at
+            } for p in posts
+        ]
+    }
+
+    cache.set(user.id, profile_data)
+    return profile_data
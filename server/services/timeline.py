@@ -0,0 +1,170 @@
+from flask import current_app
+from app import db
+from models.feed import FeedEntry
+from models.post import Post
+from models.user import User, user_friends
+from services.friend_index import friend_index
+from utils.pagination import decode_cursor, encode_cursor
+
+# Friends timeline: posts are pushed into each friend's feed_entries rows
+# when written (fan-out-on-write). Authors with more friends than
+# FEED_FANOUT_MAX_FRIENDS are flagged instead and their posts are pulled
+# at read time (fan-out-on-read), so one post never costs thousands of
+# inserts.
+
+
+def _accepted_friend_ids(user_id):
+    """Accepted friends read from user_friends in the caller's transaction.
+
+    Feed rows are permanent, so writes don't trust the per-worker friend
+    index, which may not have seen a friendship accepted or removed by
+    another worker yet.
+    """
+    return db.session.execute(
+        db.union(
+            db.select(user_friends.c.friend_id).where(
+                user_friends.c.user_id == user_id,
+                user_friends.c.status == 'accepted'
+            ),
+            db.select(user_friends.c.user_id).where(
+                user_friends.c.friend_id == user_id,
+                user_friends.c.status == 'accepted'
+            )
+        )
+    ).scalars().all()
+
+
+def fan_out_post(post):
+    """Push a flushed post into its author's friends' feeds; the caller commits"""
+    friend_ids = _accepted_friend_ids(post.user_id)
+    if not friend_ids:
+        return 0
+
+    author = db.session.get(User, post.user_id)
+    if author.feed_fanout_on_read:
+        return 0
+    if len(friend_ids) > current_app.config.get('FEED_FANOUT_MAX_FRIENDS', 1000):
+        author.feed_fanout_on_read = True
+        return 0
+
+    db.session.execute(
+        db.insert(FeedEntry),
+        [{
+            'user_id': friend_id,
+            'post_id': post.id,
+            'author_id': post.user_id,
+            'created_at': post.created_at
+        } for friend_id in friend_ids]
+    )
+    return len(friend_ids)
+
+
+def remove_post(post_id):
+    db.session.execute(db.delete(FeedEntry).where(FeedEntry.post_id == post_id))
+
+
+def backfill_friendship(user_id, friend_id):
+    """Seed each new friend's feed with the other's recent posts; the caller commits.
+
+    Only the newest FEED_BACKFILL_POSTS posts are copied, and none from
+    authors whose posts are pulled at read time anyway.
+    """
+    limit = current_app.config.get('FEED_BACKFILL_POSTS', 20)
+    if not limit:
+        return
+    for reader_id, author_id in ((user_id, friend_id), (friend_id, user_id)):
+        recent = (
+            db.select(db.literal(reader_id), Post.id, Post.user_id, Post.created_at)
+            .join(User, User.id == Post.user_id)
+            .where(
+                Post.user_id == author_id,
+                User.feed_fanout_on_read.is_not(True),
+                ~db.select(FeedEntry.post_id).where(
+                    FeedEntry.user_id == reader_id,
+                    FeedEntry.post_id == Post.id
+                ).exists()
+            )
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(limit)
+        )
+        db.session.execute(
+            db.insert(FeedEntry).from_select(
+                ['user_id', 'post_id', 'author_id', 'created_at'], recent
+            )
+        )
+
+
+def remove_friendship(user_id, friend_id):
+    """Drop each user's posts from the other's feed; the caller commits"""
+    db.session.execute(
+        db.delete(FeedEntry).where(
+            ((FeedEntry.user_id == user_id) & (FeedEntry.author_id == friend_id)) |
+            ((FeedEntry.user_id == friend_id) & (FeedEntry.author_id == user_id))
+        )
+    )
+
+
+# Above this many heavy friends their posts are pulled with one IN arm
+# instead of one index-ordered arm per author
+MAX_PULL_ARMS = 50
+
+
+def _heavy_friend_ids(user_id):
+    friend_ids = friend_index.friend_ids(user_id)
+    if not friend_ids:
+        return []
+    return db.session.execute(
+        db.select(User.id).where(
+            User.id.in_(friend_ids),
+            User.feed_fanout_on_read.is_(True)
+        )
+    ).scalars().all()
+
+
+def timeline_page(user_id, cursor=None, limit=10):
+    """Return (posts, next_cursor) for the user's friends timeline, newest first.
+
+    The reader's feed rows are keyset-paged on ix_feed_entries_user_created
+    and heavy posters' posts on ix_posts_user_created_id, each arm reading
+    at most `limit + 1` rows; the arms are merged in the same query. The
+    cursor is the (created_at, post id) of the last post, as keyset_page
+    produces, and raises InvalidCursor if malformed.
+    """
+    after = decode_cursor(cursor, 2) if cursor else None
+
+    def newest(query, created_at, post_id):
+        if after:
+            query = query.where(db.tuple_(created_at, post_id) < db.tuple_(*after))
+        return db.select(
+            query.order_by(created_at.desc(), post_id.desc()).limit(limit + 1).subquery()
+        )
+
+    arms = [newest(
+        db.select(FeedEntry.created_at, FeedEntry.post_id).where(FeedEntry.user_id == user_id),
+        FeedEntry.created_at, FeedEntry.post_id
+    )]
+    heavy_ids = _heavy_friend_ids(user_id)
+    pulled = db.select(Post.created_at, Post.id.label('post_id'))
+    if len(heavy_ids) > MAX_PULL_ARMS:
+        arms.append(newest(pulled.where(Post.user_id.in_(heavy_ids)), Post.created_at, Post.id))
+    else:
+        arms += [
+            newest(pulled.where(Post.user_id == author_id), Post.created_at, Post.id)
+            for author_id in heavy_ids
+        ]
+
+    # UNION also drops posts fanned out before their author turned heavy
+    keys = db.union(*arms).subquery() if len(arms) > 1 else arms[0].subquery()
+    rows = (
+        Post.query
+        .join(keys, Post.id == keys.c.post_id)
+        .order_by(keys.c.created_at.desc(), keys.c.post_id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].created_at, rows[-1].id])
+    return rows, next_cursor
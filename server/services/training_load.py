@@ -0,0 +1,186 @@
+from datetime import datetime, timedelta
+import numpy as np
+from app import db
+from models.challenge import UserChallenge
+from models.workout_session import DailyWorkoutRollup
+
+# Training-load analytics over the daily duration series (minutes/day).
+#
+# acute   = 7-day rolling mean load
+# chronic = 28-day rolling mean load
+# acwr    = acute / chronic
+# monotony (Foster) = 7-day mean / 7-day standard deviation
+# strain  = 7-day total load * monotony
+#
+# Series are pulled from daily_workout_rollups in one query, scattered into
+# a dense (users x days) array and every metric is computed with cumulative
+# sums along the day axis, so a cohort costs the same Python work as a
+# single user.
+
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+MAX_RANGE_DAYS = 730
+
+
+def _rolling_sum(values, window):
+    """Trailing window sums along the last axis (first window-1 entries use partial windows)"""
+    csum = np.cumsum(values, axis=-1)
+    shifted = np.zeros_like(csum)
+    shifted[..., window:] = csum[..., :-window]
+    return csum - shifted
+
+
+def _streaks(active):
+    """Current and longest run of active days, per row"""
+    counts = np.cumsum(active, axis=-1)
+    resets = np.maximum.accumulate(np.where(active, 0, counts), axis=-1)
+    runs = counts - resets
+    return runs[..., -1], runs.max(axis=-1, initial=0)
+
+
+def compute_metrics(loads, warmup):
+    """Metrics for a (users x days) load array whose first `warmup` days are history only"""
+    loads = np.asarray(loads, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        acute_sum = _rolling_sum(loads, ACUTE_DAYS)
+        acute = acute_sum / ACUTE_DAYS
+        chronic = _rolling_sum(loads, CHRONIC_DAYS) / CHRONIC_DAYS
+        acwr = np.where(chronic > 0, acute / chronic, np.nan)
+
+        mean_sq = _rolling_sum(loads ** 2, ACUTE_DAYS) / ACUTE_DAYS
+        std = np.sqrt(np.maximum(mean_sq - acute ** 2, 0))
+        monotony = np.where(std > 1e-9, acute / std, np.nan)
+        strain = acute_sum * monotony
+
+    window = slice(warmup, None)
+    current_streak, longest_streak = _streaks(loads[..., window] > 0)
+    return {
+        'load': loads[..., window],
+        'acute': acute[..., window],
+        'chronic': chronic[..., window],
+        'acwr': acwr[..., window],
+        'monotony': monotony[..., window],
+        'strain': strain[..., window],
+        'current_streak': current_streak,
+        'longest_streak': longest_streak
+    }
+
+
+def range_from_args(args, default_days=90):
+    """Read start/end (YYYY-MM-DD) query args, defaulting to the last `default_days` days"""
+    end = args.get('end')
+    end = datetime.strptime(end, '%Y-%m-%d').date() if end else datetime.utcnow().date()
+    start = args.get('start')
+    start = datetime.strptime(start, '%Y-%m-%d').date() if start else end - timedelta(days=default_days - 1)
+    return start, end
+
+
+def _clean(values):
+    return [None if np.isnan(v) else round(float(v), 3) for v in values]
+
+
+def _window(start, end):
+    if end < start:
+        raise ValueError('end must not be before start')
+    if (end - start).days + 1 > MAX_RANGE_DAYS:
+        raise ValueError(f'Range is limited to {MAX_RANGE_DAYS} days')
+    origin = start - timedelta(days=CHRONIC_DAYS - 1)
+    return origin, (end - origin).days + 1, CHRONIC_DAYS - 1
+
+
+def user_training_load(user_id, start, end):
+    """Daily series of load metrics for one user between start and end (dates, inclusive)"""
+    origin, days, warmup = _window(start, end)
+
+    rows = db.session.execute(
+        db.select(DailyWorkoutRollup.day, DailyWorkoutRollup.duration).where(
+            DailyWorkoutRollup.user_id == user_id,
+            DailyWorkoutRollup.day >= origin,
+            DailyWorkoutRollup.day <= end
+        )
+    ).all()
+
+    loads = np.zeros((1, days))
+    if rows:
+        offsets = np.fromiter(((row.day - origin).days for row in rows), dtype=int, count=len(rows))
+        loads[0, offsets] = [row.duration for row in rows]
+
+    metrics = compute_metrics(loads, warmup)
+    dates = [(start + timedelta(days=i)).isoformat() for i in range(days - warmup)]
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'days': [
+            {
+                'date': day,
+                'load': load,
+                'acute': acute,
+                'chronic': chronic,
+                'acwr': acwr,
+                'monotony': monotony,
+                'strain': strain
+            }
+            for day, load, acute, chronic, acwr, monotony, strain in zip(
+                dates,
+                _clean(metrics['load'][0]),
+                _clean(metrics['acute'][0]),
+                _clean(metrics['chronic'][0]),
+                _clean(metrics['acwr'][0]),
+                _clean(metrics['monotony'][0]),
+                _clean(metrics['strain'][0])
+            )
+        ],
+        'current_streak': int(metrics['current_streak'][0]),
+        'longest_streak': int(metrics['longest_streak'][0])
+    }
+
+
+def cohort_training_load(challenge_id, start, end):
+    """End-of-range load summary for every participant of a challenge, in one pass"""
+    origin, days, warmup = _window(start, end)
+
+    rows = db.session.execute(
+        db.select(
+            UserChallenge.user_id,
+            DailyWorkoutRollup.day,
+            DailyWorkoutRollup.duration
+        ).outerjoin(
+            DailyWorkoutRollup,
+            (DailyWorkoutRollup.user_id == UserChallenge.user_id) &
+            (DailyWorkoutRollup.day >= origin) &
+            (DailyWorkoutRollup.day <= end)
+        ).where(UserChallenge.challenge_id == challenge_id)
+    ).all()
+
+    user_ids = sorted({row.user_id for row in rows})
+    position = {user_id: i for i, user_id in enumerate(user_ids)}
+    loads = np.zeros((len(user_ids), days))
+    filled = [row for row in rows if row.day is not None]
+    if filled:
+        row_idx = np.fromiter((position[r.user_id] for r in filled), dtype=int, count=len(filled))
+        day_idx = np.fromiter(((r.day - origin).days for r in filled), dtype=int, count=len(filled))
+        loads[row_idx, day_idx] = [r.duration for r in filled]
+
+    metrics = compute_metrics(loads, warmup)
+    last = {key: metrics[key][:, -1] for key in ('acute', 'chronic', 'acwr', 'monotony', 'strain')}
+    totals = metrics['load'].sum(axis=1)
+
+    return {
+        'challenge_id': challenge_id,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'participants': [
+            {
+                'user_id': user_id,
+                'total_load': float(totals[i]),
+                'acute': _clean([last['acute'][i]])[0],
+                'chronic': _clean([last['chronic'][i]])[0],
+                'acwr': _clean([last['acwr'][i]])[0],
+                'monotony': _clean([last['monotony'][i]])[0],
+                'strain': _clean([last['strain'][i]])[0],
+                'current_streak': int(metrics['current_streak'][i]),
+                'longest_streak': int(metrics['longest_streak'][i])
+            }
+            for i, user_id in enumerate(user_ids)
+        ]
+    }
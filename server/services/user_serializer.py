@@ -0,0 +1,58 @@
+from collections import defaultdict
+from app import db
+from models.user import User, user_friends
+
+
+def serialize_users(users, include_relationships=False):
+    """Bulk equivalent of User.to_dict() for a list of users.
+
+    Counts come from the denormalized columns, and friend lists / pending
+    requests for the whole batch are filled with two grouped queries (the
+    friendship rows, then the referenced users) regardless of list size.
+    """
+    users = list(users)
+    if not include_relationships or not users:
+        return [u.to_dict() for u in users]
+
+    ids = {u.id for u in users}
+    rows = db.session.execute(
+        db.select(
+            user_friends.c.user_id,
+            user_friends.c.friend_id,
+            user_friends.c.status
+        ).where(
+            user_friends.c.user_id.in_(ids) | user_friends.c.friend_id.in_(ids)
+        )
+    ).all()
+
+    friends = defaultdict(set)
+    pending = defaultdict(set)
+    for src, dst, status in rows:
+        if status == 'accepted':
+            if src in ids:
+                friends[src].add(dst)
+            if dst in ids:
+                friends[dst].add(src)
+        elif status == 'pending' and dst in ids:
+            pending[dst].add(src)
+
+    by_id = {u.id: u for u in users}
+    missing = set().union(*friends.values(), *pending.values()) - by_id.keys()
+    if missing:
+        by_id.update(
+            (u.id, u) for u in User.query.filter(User.id.in_(missing)).all()
+        )
+
+    cards = {}
+    def card(user_id):
+        if user_id not in cards:
+            cards[user_id] = by_id[user_id].to_dict()
+        return cards[user_id]
+
+    result = []
+    for u in users:
+        data = u.to_dict()
+        data['friends'] = [card(i) for i in sorted(friends[u.id]) if i in by_id]
+        data['pending_requests'] = [card(i) for i in sorted(pending[u.id]) if i in by_id]
+        result.append(data)
+    return result
@@ -0,0 +1,120 @@
+from datetime import date, datetime, timedelta
+from app import db
+from models.workout_session import WorkoutSession, DailyWorkoutRollup
+from utils.sql import dialect_insert
+
+ROLLUP_FIELDS = ('sessions', 'duration', 'sets', 'reps', 'volume')
+
+
+def _apply_to_rollup(session, sign):
+    """Add (sign=1) or subtract (sign=-1) one session from its day's rollup row"""
+    delta = {
+        'sessions': sign,
+        'duration': sign * session.duration,
+        'sets': sign * (session.sets or 0),
+        'reps': sign * (session.reps or 0),
+        'volume': sign * session.volume
+    }
+    table = DailyWorkoutRollup.__table__
+    stmt = dialect_insert(table).values(
+        user_id=session.user_id,
+        day=session.started_at.date(),
+        **delta
+    )
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day],
+        set_={field: table.c[field] + stmt.excluded[field] for field in ROLLUP_FIELDS}
+    ))
+
+
+def record_session(session):
+    """Persist a session and fold it into the daily rollup; the caller commits"""
+    db.session.add(session)
+    db.session.flush()
+    _apply_to_rollup(session, 1)
+
+
+def remove_session(session):
+    _apply_to_rollup(session, -1)
+    db.session.delete(session)
+
+
+def rebuild_rollups(user_id=None):
+    """Recompute rollups from raw sessions (all users, or one)"""
+    volume = db.func.coalesce(
+        WorkoutSession.sets * WorkoutSession.reps * WorkoutSession.load, 0
+    )
+    day = db.func.date(WorkoutSession.started_at)
+    query = db.select(
+        WorkoutSession.user_id,
+        day,
+        db.func.count(WorkoutSession.id),
+        db.func.sum(WorkoutSession.duration),
+        db.func.sum(db.func.coalesce(WorkoutSession.sets, 0)),
+        db.func.sum(db.func.coalesce(WorkoutSession.reps, 0)),
+        db.func.sum(volume)
+    ).group_by(WorkoutSession.user_id, day)
+
+    delete = db.delete(DailyWorkoutRollup)
+    if user_id is not None:
+        query = query.where(WorkoutSession.user_id == user_id)
+        delete = delete.where(DailyWorkoutRollup.user_id == user_id)
+
+    rows = db.session.execute(query).all()
+    db.session.execute(delete)
+    if rows:
+        db.session.execute(db.insert(DailyWorkoutRollup), [{
+            'user_id': row[0],
+            'day': row[1] if isinstance(row[1], date) else date.fromisoformat(row[1]),
+            'sessions': row[2],
+            'duration': row[3] or 0,
+            'sets': row[4] or 0,
+            'reps': row[5] or 0,
+            'volume': row[6] or 0
+        } for row in rows])
+    db.session.commit()
+    return len(rows)
+
+
+def _bucket_start(day, period):
+    if period == 'month':
+        return day.replace(day=1)
+    return day - timedelta(days=day.weekday())
+
+
+def workout_stats(user_id, period='week', start=None, end=None):
+    """Weekly or monthly totals between `start` and `end` (inclusive dates).
+
+    Reads only the daily rollup rows, so a year of history is at most 366
+    rows regardless of how many sessions were logged.
+    """
+    end = end or datetime.utcnow().date()
+    if start is None:
+        start = end - timedelta(weeks=12) if period == 'week' else (end - timedelta(days=365)).replace(day=1)
+
+    rows = DailyWorkoutRollup.query.filter(
+        DailyWorkoutRollup.user_id == user_id,
+        DailyWorkoutRollup.day >= start,
+        DailyWorkoutRollup.day <= end,
+        DailyWorkoutRollup.sessions > 0
+    ).order_by(DailyWorkoutRollup.day).all()
+
+    buckets = {}
+    totals = dict.fromkeys(ROLLUP_FIELDS, 0)
+    for row in rows:
+        key = _bucket_start(row.day, period)
+        bucket = buckets.setdefault(key, dict.fromkeys(ROLLUP_FIELDS, 0))
+        for field in ROLLUP_FIELDS:
+            bucket[field] += getattr(row, field)
+            totals[field] += getattr(row, field)
+
+    return {
+        'period': period,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'buckets': [
+            {'start': key.isoformat(), **values}
+            for key, values in sorted(buckets.items())
+        ],
+        'totals': totals
+    }
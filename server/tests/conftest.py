@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+os.environ.setdefault('JWT_SECRET_KEY', 'test-secret-key-test-secret-key-test')
+
+from app import create_app, db
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    JWT_SECRET_KEY = 'test-secret-key-test-secret-key-test'
+    INVALIDATION_TRANSPORT = 'none'
+    SQL_INSTRUMENTATION = True
+    # Query-count assertions need every request to reach the database
+    CACHE_TTLS = {'author_cards': 0, 'challenges': 0}
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
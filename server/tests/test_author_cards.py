@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+from app import db
+from models.post import Post
+from models.user import User
+
+
+def _seed_posts(authors=40, posts=80):
+    users = [User(username=f'author{i:03d}', email=f'author{i:03d}@example.com', bio='') for i in range(authors)]
+    for user in users:
+        user.password_hash = 'x'
+    db.session.add_all(users)
+    db.session.flush()
+
+    start = datetime(2024, 1, 1)
+    db.session.add_all(
+        Post(content=f'post {i}', user_id=users[i % authors].id, created_at=start + timedelta(minutes=i))
+        for i in range(posts)
+    )
+    db.session.commit()
+
+
+def _query_count(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return int(response.headers['X-Query-Count']), response.get_json()
+
+
+def test_post_listing_query_count_does_not_grow_with_page_size(client):
+    _seed_posts()
+
+    small, small_body = _query_count(client, '/api/posts/?per_page=10')
+    large, large_body = _query_count(client, '/api/posts/?per_page=50')
+
+    assert len(small_body['posts']) == 10
+    assert len({post['user']['id'] for post in large_body['posts']}) == 40
+    assert small == large
+
+
+def test_cursor_listing_query_count_does_not_grow_with_page_size(client):
+    _seed_posts()
+
+    small, _ = _query_count(client, '/api/posts/?cursor=&per_page=10')
+    large, _ = _query_count(client, '/api/posts/?cursor=&per_page=50')
+
+    assert small == large
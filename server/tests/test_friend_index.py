@@ -0,0 +1,25 @@
+from app import db
+from models.user import User, user_friends
+from services.friend_index import friend_index
+
+
+def test_index_evicts_least_recently_used_users(app):
+    users = [User(username=f'user{i:02d}', email=f'user{i:02d}@example.com', bio='') for i in range(4)]
+    for user in users:
+        user.password_hash = 'x'
+    db.session.add_all(users)
+    db.session.flush()
+    db.session.execute(user_friends.insert(), [
+        {'user_id': users[0].id, 'friend_id': user.id, 'status': 'accepted'} for user in users[1:]
+    ])
+    db.session.commit()
+    app.config['FRIEND_INDEX_MAX_USERS'] = 2
+    a, b, c = (user.id for user in users[1:])
+
+    friend_index.friend_ids(a)
+    friend_index.friend_ids(b)
+    friend_index.friend_ids(a)
+    friend_index.friend_ids(c)
+
+    assert list(app.extensions['friend_index']['users']) == [a, c]
+    assert friend_index.friend_ids(b) == [users[0].id]
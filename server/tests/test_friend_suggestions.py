@@ -0,0 +1,60 @@
+from sqlalchemy import event
+
+from app import db
+from models.user import User, user_friends
+from services.friend_suggestions import suggest_friends
+
+
+def _seed_friendships(edges, users=12):
+    people = [User(username=f'user{i:02d}', email=f'user{i:02d}@example.com', bio='') for i in range(1, users + 1)]
+    for user in people:
+        user.password_hash = 'x'
+    db.session.add_all(people)
+    db.session.flush()
+    db.session.execute(user_friends.insert(), [
+        {'user_id': a, 'friend_id': b, 'status': status} for a, b, status in edges
+    ])
+    db.session.commit()
+
+
+def test_ranks_friends_of_friends_by_mutual_count(app):
+    _seed_friendships([
+        (1, 2, 'accepted'),
+        (3, 1, 'accepted'),          # stored in the other direction
+        (1, 4, 'accepted'),
+        (4, 1, 'accepted'),          # and in both directions
+        (2, 5, 'accepted'),
+        (6, 3, 'accepted'),
+        (4, 5, 'accepted'),
+        (5, 3, 'accepted'),
+        (2, 7, 'accepted'),
+        (2, 8, 'accepted'),
+        (1, 8, 'pending'),           # already related, never suggested
+        (3, 9, 'pending'),           # not accepted, not a path
+    ])
+
+    suggestions = suggest_friends(1, limit=4)
+
+    assert [(s['id'], s['mutualFriends']) for s in suggestions] == [(5, 3), (6, 1), (7, 1), (9, 0)]
+
+
+def test_suggestions_only_search_user_friends_by_index(app):
+    _seed_friendships([(1, 2, 'accepted'), (2, 3, 'accepted'), (4, 5, 'accepted')])
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        suggest_friends(1)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    statement, parameters = statements[0]
+    plan = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+    details = [row[-1] for row in plan]
+
+    # A full pass over the friendship table costs seconds at scale
+    assert not [d for d in details if d.startswith('SCAN user_friends')], details
+    assert any(d.startswith('SEARCH user_friends') for d in details)
@@ -0,0 +1,67 @@
+from services.invalidation import RESET, InvalidationBus, SequenceLogTransport
+
+
+def _message(n):
+    return {'origin': 'writer', 'channel': 'cache.tags', 'payload': [f'tag-{n}']}
+
+
+def _pair(tmp_path, max_bytes=4 * 1024 * 1024):
+    path = str(tmp_path / 'invalidation.log')
+    writer = SequenceLogTransport(path, max_bytes)
+    reader = SequenceLogTransport(path, max_bytes)
+    # A reader's first poll positions it at the end of the log
+    assert reader.receive() == []
+    return writer, reader
+
+
+def test_delivers_messages_in_order(tmp_path):
+    writer, reader = _pair(tmp_path)
+    for n in range(3):
+        writer.send(_message(n))
+
+    assert reader.receive() == [_message(n) for n in range(3)]
+    assert reader.receive() == []
+
+
+def test_bus_skips_its_own_messages(tmp_path):
+    path = str(tmp_path / 'invalidation.log')
+    sender = InvalidationBus(SequenceLogTransport(path))
+    receiver = InvalidationBus(SequenceLogTransport(path))
+    seen = {'sender': [], 'receiver': []}
+    sender.subscribe('cache.tags', lambda payload, remote: seen['sender'].append((payload, remote)))
+    receiver.subscribe('cache.tags', lambda payload, remote: seen['receiver'].append((payload, remote)))
+    sender.poll()
+    receiver.poll()
+
+    sender.publish('cache.tags', ['products'])
+    sender.poll()
+    receiver.poll()
+
+    assert seen['sender'] == [(['products'], False)]
+    assert seen['receiver'] == [(['products'], True)]
+
+
+def test_reader_follows_one_rotation(tmp_path):
+    line = len(b'{"origin":"writer","channel":"cache.tags","payload":["tag-00"]}\n')
+    writer, reader = _pair(tmp_path, max_bytes=line * 10)
+    sent = [_message(n) for n in range(15)]
+    for message in sent:
+        writer.send(message)
+
+    assert reader.receive() == sent
+    writer.send(_message(99))
+    assert reader.receive() == [_message(99)]
+
+
+def test_reader_gets_reset_after_missing_rotations(tmp_path):
+    line = len(b'{"origin":"writer","channel":"cache.tags","payload":["tag-00"]}\n')
+    writer, reader = _pair(tmp_path, max_bytes=line * 10)
+    for n in range(45):
+        writer.send(_message(n))
+
+    received = reader.receive()
+
+    assert received[0] == RESET
+    # Everything after the reset comes from the current file, in order
+    tail = received[1:]
+    assert tail and tail == [_message(n) for n in range(45 - len(tail), 45)]
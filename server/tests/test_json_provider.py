@@ -0,0 +1,22 @@
+import json
+
+import pytest
+
+pytest.importorskip('orjson')
+
+
+def test_exponent_floats_are_spelled_differently_but_parse_the_same(app):
+    values = [1e20, 1e-7, 1e-05, 2.5e-10, 0.1]
+
+    body = app.json.dumps(values, separators=(',', ':'))
+
+    assert body == '[1e20,1e-7,0.00001,2.5e-10,0.1]'
+    assert json.dumps(values, separators=(',', ':')) == '[1e+20,1e-07,1e-05,2.5e-10,0.1]'
+    assert json.loads(body) == values
+
+
+def test_non_finite_floats_are_encoded_as_null(app):
+    with app.test_request_context():
+        response = app.json.response({'avg': float('nan'), 'max': float('inf'), 'min': float('-inf')})
+
+    assert json.loads(response.get_data()) == {'avg': None, 'max': None, 'min': None}
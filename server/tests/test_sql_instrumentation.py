@@ -0,0 +1,27 @@
+import time
+
+import pytest
+from flask import g
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from utils.sql_instrumentation import RequestStats
+
+
+def test_failed_statements_leave_no_timing_state_behind(app):
+    with app.test_request_context():
+        g._sql_stats = RequestStats()
+        conn = db.session.connection()
+        conn.execute(text('SELECT 1'))
+        before = {key: list(value) if isinstance(value, list) else value for key, value in conn.info.items()}
+
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text('SELECT * FROM no_such_table'))
+        time.sleep(0.05)
+        conn.execute(text('SELECT 1'))
+
+        assert conn.info == before
+        assert g._sql_stats.count == 2
+        assert g._sql_stats.db_time < 0.05
@@ -0,0 +1,46 @@
+from app import db
+from models.feed import FeedEntry
+from models.post import Post
+from models.user import User, user_friends
+from services import timeline
+from services.friend_index import friend_index
+
+
+def _users(count):
+    users = [User(username=f'user{i:02d}', email=f'user{i:02d}@example.com', bio='') for i in range(count)]
+    for user in users:
+        user.password_hash = 'x'
+    db.session.add_all(users)
+    db.session.commit()
+    return users
+
+
+def _publish(author):
+    post = Post(content='hello', user_id=author.id)
+    db.session.add(post)
+    db.session.flush()
+    timeline.fan_out_post(post)
+    db.session.commit()
+    return post
+
+
+def test_fan_out_reads_friendships_from_the_table(app):
+    author, removed, accepted = _users(3)
+    db.session.execute(user_friends.insert(), [
+        {'user_id': author.id, 'friend_id': removed.id, 'status': 'accepted'},
+        {'user_id': accepted.id, 'friend_id': author.id, 'status': 'pending'},
+    ])
+    db.session.commit()
+    assert friend_index.friend_ids(author.id) == [removed.id]
+
+    # Another worker removes one friendship and accepts the other; this
+    # worker's index hasn't heard about either yet
+    db.session.execute(user_friends.delete().where(user_friends.c.friend_id == removed.id))
+    db.session.execute(user_friends.update().where(user_friends.c.user_id == accepted.id).values(status='accepted'))
+    db.session.commit()
+    assert friend_index.friend_ids(author.id) == [removed.id]
+
+    post = _publish(author)
+
+    readers = db.session.execute(db.select(FeedEntry.user_id).where(FeedEntry.post_id == post.id)).scalars().all()
+    assert readers == [accepted.id]
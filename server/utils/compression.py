@@ -0,0 +1,160 @@
+import gzip
+import mimetypes
+import os
+import re
+
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'application/json',
+    'application/javascript',
+    'application/manifest+json',
+    'application/xml',
+    'image/svg+xml',
+}
+
+# Vite writes content-hashed bundles as assets/<name>-<hash>.<ext>
+HASHED_ASSET = re.compile(r'(^|/)assets/.+-[A-Za-z0-9_-]{8,}\.\w+$')
+
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+# Dynamic responses favour speed over ratio; assets are compressed ahead of time
+BROTLI_QUALITY = 4
+
+
+def _encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def is_compressible(mimetype):
+    return bool(mimetype) and (mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES)
+
+
+def compress(data, encoding, level=6):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def discover_static(static_folder):
+    """Map every file under the build folder to its precompressed siblings.
+
+    Returns {relative path: {encoding: relative path of the variant}}, with
+    paths using forward slashes as they appear in URLs.
+    """
+    manifest = {}
+    if not static_folder or not os.path.isdir(static_folder):
+        return manifest
+
+    for root, _, files in os.walk(static_folder):
+        names = set(files)
+        for name in files:
+            if name.endswith(('.br', '.gz')):
+                continue
+            path = os.path.relpath(os.path.join(root, name), static_folder).replace(os.sep, '/')
+            manifest[path] = {
+                encoding: path + suffix
+                for encoding, suffix in PRECOMPRESSED
+                if name + suffix in names
+            }
+    return manifest
+
+
+def precompress_static(static_folder, min_size=512):
+    """Write maximum-ratio .gz/.br siblings for the text assets of a build; returns files written"""
+    written = 0
+    for path in discover_static(static_folder):
+        source = os.path.join(static_folder, path)
+        if not is_compressible(mimetypes.guess_type(path)[0]) or os.path.getsize(source) < min_size:
+            continue
+        with open(source, 'rb') as f:
+            data = f.read()
+        targets = [('.gz', lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            targets.append(('.br', lambda d: brotli.compress(d, quality=11)))
+        for suffix, encode in targets:
+            target = source + suffix
+            if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+                continue
+            with open(target, 'wb') as f:
+                f.write(encode(data))
+            written += 1
+    return written
+
+
+def send_static(app, filename):
+    """Serve a build file, preferring a precompressed variant the client accepts.
+
+    Content-hashed assets are cached for a year as immutable; everything
+    else (index.html, favicon, ...) must be revalidated on each use.
+    """
+    variants = app.extensions['static_manifest'].get(filename)
+    if variants is None:
+        response = send_from_directory(app.static_folder, filename)
+    else:
+        encoding = request.accept_encodings.best_match(list(variants)) if variants else None
+        if encoding:
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            response = send_from_directory(app.static_folder, variants[encoding], mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+        else:
+            response = send_from_directory(app.static_folder, filename)
+        if variants:
+            response.vary.add('Accept-Encoding')
+
+    if HASHED_ASSET.search(filename):
+        response.headers['Cache-Control'] = IMMUTABLE
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+
+def init_app(app):
+    """Serve the SPA build precompressed and compress large dynamic responses.
+
+    The build folder is scanned once at startup for `.br`/`.gz` siblings
+    (see `flask compress-static`). Dynamic responses of at least
+    COMPRESS_MIN_SIZE bytes are compressed with brotli or gzip, whichever
+    the client prefers; brotli is used only if the module is installed.
+    """
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    level = app.config.get('COMPRESS_LEVEL', 6)
+
+    app.extensions['static_manifest'] = discover_static(app.static_folder)
+    if app.static_folder and 'static' in app.view_functions:
+        app.view_functions['static'] = lambda filename: send_static(app, filename)
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or not is_compressible(response.mimetype)
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if request.method == 'HEAD' or response.content_length is None or response.content_length < min_size:
+            return response
+
+        encoding = request.accept_encodings.best_match(_encodings())
+        if not encoding:
+            return response
+
+        response.set_data(compress(response.get_data(), encoding, level))
+        response.headers['Content-Encoding'] = encoding
+        # The compressed bytes differ, so a strong validator no longer holds
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,66 @@
+import hashlib
+from functools import wraps
+
+from flask import current_app, g, make_response, request
+from werkzeug.http import is_resource_modified
+
+from app import db
+from models.resource_version import ResourceVersion
+
+
+def collection_validator(name, model, count=True):
+    """(row count, newest created_at, version, version updated_at) in one round trip.
+
+    Skip the count for large tables; the version counter already changes on
+    every write made through the API.
+    """
+    version = ResourceVersion.__table__.c
+    columns = [
+        db.select(db.func.max(model.created_at)).scalar_subquery(),
+        db.select(version.version).where(version.name == name).scalar_subquery(),
+        db.select(version.updated_at).where(version.name == name).scalar_subquery(),
+    ]
+    if count:
+        columns.append(db.select(db.func.count()).select_from(model).scalar_subquery())
+    row = db.session.execute(db.select(*columns)).one()
+    return tuple(row)
+
+
+def current_validator():
+    """Validator computed for this request by @conditional, or None"""
+    return g.get('_collection_validator')
+
+
+def conditional(name, model, count=True):
+    """Answer If-None-Match / If-Modified-Since with 304 before the view runs.
+
+    The weak ETag hashes the collection validator together with the request
+    path and query string, so every page or filter gets its own tag while
+    sharing one cheap validator query. Last-Modified is the later of the
+    newest row and the last recorded write.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            validator = collection_validator(name, model, count)
+            g._collection_validator = validator
+            newest, _, written_at = validator[:3]
+            last_modified = max(filter(None, (newest, written_at)), default=None)
+            etag = hashlib.sha1(
+                f'{name}:{validator}:{request.full_path}'.encode()
+            ).hexdigest()[:20]
+
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if last_modified:
+                response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
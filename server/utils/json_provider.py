@@ -0,0 +1,88 @@
+import codecs
+from datetime import date, time
+from json.encoder import encode_basestring_ascii
+
+from flask.json.provider import DefaultJSONProvider, _default
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _escape_non_ascii(error):
+    # Codec error handler: called once per run of non-ASCII characters,
+    # which in JSON text can only occur inside strings
+    return encode_basestring_ascii(error.object[error.start:error.end])[1:-1], error.end
+
+
+codecs.register_error('json-escape', _escape_non_ascii)
+
+
+def _default_iso(o):
+    if isinstance(o, (date, time)):
+        return o.isoformat()
+    return _default(o)
+
+
+class AppJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes with orjson when it's installed.
+
+    Dates and datetimes are encoded natively as ISO 8601 strings, the same
+    text `.isoformat()` produces, so serializers can hand over datetime
+    objects as-is. Output matches the stdlib provider byte for byte: sorted
+    keys, ASCII escapes and the debug-mode indentation are preserved.
+    Non-ASCII text (emoji avatars, mostly) is escaped in orjson's output
+    rather than re-encoded; payloads orjson can't encode at all (non-string
+    keys, integers beyond 64 bits) fall back to the stdlib. Two differences
+    are left, because scanning every response for them would cost more than
+    the encoding itself:
+
+    - floats the stdlib writes with an exponent are spelled orjson's way
+      (1e20 for 1e+20, 1e-7 for 1e-07, 0.00001 for 1e-05); they parse to
+      the same number;
+    - NaN and infinities become null, where the stdlib writes NaN and
+      Infinity, which aren't valid JSON and which browsers' JSON.parse
+      rejects.
+    """
+
+    default = staticmethod(_default_iso)
+
+    def _orjson_dumps(self, obj, indent):
+        if orjson is None or not self.sort_keys:
+            return None
+        # Non-string keys raise here and fall back, so int keys keep the stdlib's numeric order
+        option = orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            data = orjson.dumps(obj, default=self.default, option=option)
+        except (orjson.JSONEncodeError, TypeError):
+            return None
+        if self.ensure_ascii:
+            if not data.isascii():
+                data = data.decode().encode('ascii', 'json-escape')
+            if b'\x7f' in data:
+                # DEL is ASCII but the stdlib escapes it too
+                data = data.replace(b'\x7f', b'\\u007f')
+        return data
+
+    def dumps(self, obj, **kwargs):
+        if kwargs == {'separators': (',', ':')}:
+            data = self._orjson_dumps(obj, indent=False)
+            if data is not None:
+                return data.decode()
+        elif kwargs == {'indent': 2}:
+            data = self._orjson_dumps(obj, indent=True)
+            if data is not None:
+                return data.decode()
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        data = self._orjson_dumps(obj, indent=indent)
+        if data is None:
+            dump_args = {'indent': 2} if indent else {'separators': (',', ':')}
+            data = super().dumps(obj, **dump_args).encode()
+        return self._app.response_class(data + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,58 @@
+import base64
+import json
+from datetime import datetime
+from app import db
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(values):
+    """Pack the sort key of the last row into an opaque, URL-safe token"""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != size:
+            raise InvalidCursor('Invalid cursor')
+        return [_decode_value(v) for v in values]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+
+
+def keyset_page(query, columns, cursor=None, limit=10):
+    """Return (items, next_cursor) for a query ordered by `columns` descending.
+
+    `columns` must form a unique sort key, e.g. (Post.created_at, Post.id),
+    ideally backed by a composite index. Only `limit + 1` rows are read and
+    no COUNT is issued.
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(columns))
+        query = query.filter(db.tuple_(*columns) < db.tuple_(*values))
+
+    rows = query.order_by(*[c.desc() for c in columns]).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return rows, next_cursor
@@ -0,0 +1,15 @@
+from app import db
+
+
+def dialect_insert(table):
+    """Dialect-specific INSERT supporting ON CONFLICT (PostgreSQL/SQLite)"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def insert_ignore(table):
+    """INSERT ... ON CONFLICT DO NOTHING"""
+    return dialect_insert(table).on_conflict_do_nothing()
@@ -0,0 +1,112 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger('gymhum.sql')
+
+_WHITESPACE = re.compile(r'\s+')
+# Expanded IN lists and multi-row VALUES differ only in their placeholder count
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:\?|%\(\w+\)s|%s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|:\w+))+\s*\)')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def statement_shape(statement):
+    """Normalize a SQL string so the same query with different parameters compares equal"""
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _PLACEHOLDER_LIST.sub('(?)', shape)
+    return _LITERAL.sub('?', shape)
+
+
+class RequestStats:
+    """SQL activity recorded while serving one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.db_time += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold):
+        """Statement shapes that ran more than `threshold` times, most frequent first"""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+
+def _current_stats():
+    if has_request_context():
+        return g.get('_sql_stats')
+    return None
+
+
+# The start time lives on the execution context, not the pooled connection,
+# so a statement that raises (and never reaches after_cursor_execute)
+# leaves nothing behind to skew the next one
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = context._query_start_time
+    stats = _current_stats()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def init_app(app, engine):
+    """Count statements, DB time and repeated shapes per request when SQL_INSTRUMENTATION is on.
+
+    Adds `X-Query-Count` and `Server-Timing` headers, logs one JSON line per
+    request on the `gymhum.sql` logger and warns when a single statement
+    shape runs more than SQL_N_PLUS_ONE_THRESHOLD times (a likely N+1).
+    """
+    if not app.config.get('SQL_INSTRUMENTATION'):
+        return
+
+    threshold = app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 5)
+
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_sql_stats():
+        g._sql_stats = RequestStats()
+
+    @app.after_request
+    def report_sql_stats(response):
+        stats = g.pop('_sql_stats', None)
+        if stats is None:
+            return response
+
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        db_ms = stats.db_time * 1000
+        response.headers['X-Query-Count'] = str(stats.count)
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={db_ms:.2f};desc="{stats.count} queries", app;dur={total_ms:.2f}'
+        )
+
+        repeated = stats.repeated(threshold)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'queries': stats.count,
+            'db_ms': round(db_ms, 2),
+            'total_ms': round(total_ms, 2),
+            'n_plus_one': [{'statement': shape, 'count': n} for shape, n in repeated]
+        }))
+        for shape, n in repeated:
+            logger.warning('Possible N+1 on %s %s: statement ran %d times: %s',
+                           request.method, request.path, n, shape)
+        return response